@@ -0,0 +1,99 @@
+"""
+JSON helpers shared by the agentic layer.
+Uses orjson when available and falls back to the stdlib json module.
+"""
+
+import re
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+    import json
+
+# Raised by loads() on malformed input (orjson.JSONDecodeError subclasses it)
+if orjson is not None:
+    JSONDecodeError = orjson.JSONDecodeError
+else:
+    JSONDecodeError = json.JSONDecodeError
+
+# NumPy arrays are written straight from their buffer (no .tolist() copy)
+if orjson is not None:
+    _DUMPS_OPTIONS = orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj: Any) -> Any:
+    """Stdlib fallback for NumPy arrays and scalars."""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# First fenced block (optionally tagged json); an unclosed fence runs to the end
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)\s*(?:```|\Z)", re.DOTALL)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize obj (which may contain NumPy arrays) to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=_DUMPS_OPTIONS)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=_default).encode("utf-8")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Deserialize JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def extract_json(text: str) -> str:
+    """Extract JSON from an LLM response, handling markdown code blocks."""
+    match = _JSON_FENCE_RE.search(text)
+    return (match.group(1) if match else text).strip()
+
+
+class JSONObjectScanner:
+    """
+    Incremental brace counter for streamed text.
+
+    Feed chunks as they arrive; feed() returns True once the first top-level
+    JSON object has closed, so the caller can stop reading the stream.
+    Braces inside JSON strings are ignored.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+        self.complete = False
+
+    def feed(self, chunk: str) -> bool:
+        """Consume a chunk of text; return True when the object is complete."""
+        if self.complete:
+            return True
+
+        for ch in chunk:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == "{":
+                self.depth += 1
+                self.started = True
+            elif not self.started:
+                continue
+            elif ch == '"':
+                self.in_string = True
+            elif ch == "}":
+                self.depth -= 1
+                if self.depth == 0:
+                    self.complete = True
+                    return True
+
+        return False
@@ -0,0 +1,40 @@
+"""
+Numeric kernels for reducing swarm state snapshots.
+JIT-compiled with Numba when it is installed; plain NumPy otherwise.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - optional speedup
+    njit = None
+
+
+def _reduce_state_loop(pos_z: np.ndarray, battery: np.ndarray, healthy: np.ndarray) -> Tuple[float, float, int]:
+    """Single fused pass: (avg altitude, avg battery, healthy count)."""
+    n = pos_z.shape[0]
+    alt_sum = 0.0
+    bat_sum = 0.0
+    count = 0
+    for i in range(n):
+        alt_sum += pos_z[i]
+        bat_sum += battery[i]
+        if healthy[i]:
+            count += 1
+    return alt_sum / n, bat_sum / n, count
+
+
+def _reduce_state_numpy(pos_z: np.ndarray, battery: np.ndarray, healthy: np.ndarray) -> Tuple[float, float, int]:
+    """NumPy fallback with the same contract as the JIT kernel."""
+    return float(pos_z.mean()), float(battery.mean()), int(np.count_nonzero(healthy))
+
+
+if njit is not None:
+    reduce_state = njit(cache=True, fastmath=True)(_reduce_state_loop)
+    # Compile now (or load from the on-disk cache) instead of on the first mission
+    reduce_state(np.zeros(1), np.zeros(1), np.ones(1, dtype=np.bool_))
+else:
+    reduce_state = _reduce_state_numpy
@@ -3,14 +3,56 @@ Agentic Controller: LLM-driven UAV swarm control with feedback loop.
 Integrates Gemini API with simulation through translation layer.
 """
 
+import asyncio
+import io
 import os
+import logging
+import re
 import json
-from typing import Optional, Dict, Any
+import string
+import sys
+import hashlib
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
 from dotenv import load_dotenv
 import google.generativeai as genai
+from pydantic import ValidationError
 
-from translation_schema import MissionPlan, ACTION_TEMPLATES, LLM_SYSTEM_PROMPT
-from api_translator import SimulationAPIClient, EnvironmentTranslator
+import _json_utils
+from translation_schema import MissionPlan, RENDERED_SYSTEM_PROMPT
+from api_translator import SimulationAPIClient, EnvironmentTranslator, logger as mission_logger
+
+
+# Plan cache: an exact repeat of a command against the same swarm state reuses
+# the plan instead of calling the LLM; entries are LRU-bounded and expire
+PLAN_CACHE_MAX_ENTRIES = 128
+PLAN_CACHE_TTL = 300.0  # seconds
+
+
+# Per-call tail of the prompt; the system prompt prefix is rendered once
+_COMMAND_PROMPT = string.Template(
+    '\n\nUser Command: "$command"\n\nGenerate a MissionPlan in valid JSON format:'
+)
+
+# API key genai was last configured with (configure() is process-global)
+_configured_api_key: Optional[str] = None
+
+
+def _configure_genai(api_key: str):
+    """Configure the Gemini client once per API key."""
+    global _configured_api_key
+    if _configured_api_key != api_key:
+        genai.configure(api_key=api_key)
+        _configured_api_key = api_key
+
+
+@functools.lru_cache(maxsize=4)
+def _get_model(name: str) -> genai.GenerativeModel:
+    """Shared GenerativeModel per model name, so its HTTPS session is reused."""
+    return genai.GenerativeModel(name)
 
 
 class AgenticSwarmController:
@@ -19,13 +61,16 @@ class AgenticSwarmController:
     Handles natural language → structured actions → API execution → feedback.
     """
 
-    def __init__(self, api_base_url: str = "http://localhost:8000", gemini_model: str = "models/gemini-flash-latest"):
+    def __init__(self, api_base_url: str = "http://localhost:8000", gemini_model: str = "models/gemini-flash-latest",
+                 plan_cache: bool = True, verbose: bool = True):
         """
         Initialize the agentic controller.
 
         Args:
             api_base_url: Base URL of simulation API
             gemini_model: Gemini model to use for generation
+            plan_cache: Reuse plans for repeated commands issued against the same swarm state
+            verbose: Print progress banners and the mission plan (off for headless use)
         """
         # Load environment variables
         load_dotenv(dotenv_path="../.env")
@@ -34,33 +79,72 @@ class AgenticSwarmController:
         if not api_key:
             raise ValueError("GEMINI_API_KEY not found in .env file")
 
-                # Configure Gemini
-
-        genai.configure(api_key=api_key)
+        # Configure Gemini
+        _configure_genai(api_key)
 
-        self.model = genai.GenerativeModel(gemini_model)
+        self.model = _get_model(gemini_model)
 
         # Initialize API client and translator
         self.api_client = SimulationAPIClient(api_base_url)
         self.env_translator = EnvironmentTranslator()
 
-        # Build system prompt with action templates
-        templates_json = json.dumps(ACTION_TEMPLATES, indent=2)
-        self.system_prompt = LLM_SYSTEM_PROMPT.format(action_templates=templates_json)
+        # System prompt with action templates (rendered at import)
+        self.system_prompt = RENDERED_SYSTEM_PROMPT
+        self._prompt_prefix = self.system_prompt + "\n\n"
+
+        # Plan cache: (insert time, plan) keyed on the normalized command plus a
+        # digest of the drone state; plans are generated on worker threads, hence the lock
+        self.plan_cache = plan_cache
+        self._plan_cache: "OrderedDict[bytes, Tuple[float, MissionPlan]]" = OrderedDict()
+        self._plan_cache_lock = threading.Lock()
+
+        # Plans being generated right now, so concurrent identical commands share one LLM call
+        self._inflight_plans: Dict[bytes, asyncio.Future] = {}
+
+        # Print streaming progress while the plan is generated (interactive mode)
+        self.show_stream_progress = False
+        self.verbose = verbose
 
-        print("[Controller] Initialized")
-        print(f"[Controller] Using model: {gemini_model}")
-        print(f"[Controller] API endpoint: {api_base_url}")
+        if self.verbose:
+            print("[Controller] Initialized")
+            print(f"[Controller] Using model: {gemini_model}")
+            print(f"[Controller] API endpoint: {api_base_url}")
 
         # Check API health
         if not self.api_client.health_check():
             print("[Controller] ⚠ Warning: Simulation API not responding")
             print("[Controller] Make sure simulation is running: python main.py")
 
+    def close(self):
+        """Release the simulation API connection pool."""
+        self.api_client.close()
+
+    async def aclose(self):
+        """Release both the blocking and the async connection pools."""
+        self.api_client.close()
+        await self.api_client.aclose()
+
     def process_command(self, user_command: str, execute: bool = True) -> Dict[str, Any]:
+        """
+        Process a natural language command through the full pipeline
+        (blocking wrapper around aprocess_command).
+
+        Args:
+            user_command: Natural language instruction
+            execute: Whether to execute the plan (False for dry-run)
+
+        Returns:
+            Dict containing plan, execution results, and feedback
+        """
+        return self.api_client.run_sync(self.aprocess_command(user_command, execute))
+
+    async def aprocess_command(self, user_command: str, execute: bool = True) -> Dict[str, Any]:
         """
         Process a natural language command through the full pipeline.
 
+        Simulation calls share the client's async connection pool; the
+        blocking LLM call runs in a worker thread.
+
         Args:
             user_command: Natural language instruction
             execute: Whether to execute the plan (False for dry-run)
@@ -68,23 +152,29 @@ class AgenticSwarmController:
         Returns:
             Dict containing plan, execution results, and feedback
         """
-        print(f"\n{'='*70}")
-        print(f"[Controller] Processing Command:")
-        print(f"[Controller] \"{user_command}\"")
-        print(f"{'='*70}\n")
+        verbose = self.verbose
+        if verbose:
+            print(f"\n{'='*70}")
+            print(f"[Controller] Processing Command:")
+            print(f"[Controller] \"{user_command}\"")
+            print(f"{'='*70}\n")
 
         # Step 1: Get current state
-        print("[Controller] Step 1: Fetching current swarm state...")
-        current_state = self.api_client.get_state()
-        state_summary = self.env_translator.state_to_summary(current_state) if current_state else "Unknown state"
-        print(f"[Controller] Current State: {state_summary}")
+        if verbose:
+            print("[Controller] Step 1: Fetching current swarm state...")
+        current_state = await self.api_client.aget_state()
+        if verbose:
+            state_summary = self.env_translator.state_to_summary(current_state) if current_state else "Unknown state"
+            print(f"[Controller] Current State: {state_summary}")
 
         # Step 2: Generate structured plan from LLM
-        print("\n[Controller] Step 2: Generating mission plan with LLM...")
+        if verbose:
+            print("\n[Controller] Step 2: Generating mission plan with LLM...")
         try:
-            mission_plan = self._generate_plan(user_command, current_state)
-            print(f"[Controller] ✓ Plan generated: {mission_plan.mission_name}")
-            print(f"[Controller] Actions: {len(mission_plan.actions)}")
+            mission_plan = await self._agenerate_plan(user_command, current_state)
+            if verbose:
+                print(f"[Controller] ✓ Plan generated: {mission_plan.mission_name}")
+                print(f"[Controller] Actions: {len(mission_plan.actions)}")
         except Exception as e:
             error_msg = f"Failed to generate plan: {str(e)}"
             print(f"[Controller] ✗ Error: {error_msg}")
@@ -95,106 +185,244 @@ class AgenticSwarmController:
             }
 
         # Step 3: Display plan
-        print("\n[Controller] Step 3: Mission Plan:")
-        print(f"{'─'*70}")
-        for idx, action in enumerate(mission_plan.actions, 1):
-            print(f"  {idx}. {action.action_type.upper()} → Drones {action.drone_ids}")
-            print(f"     Parameters: {action.parameters}")
-            print(f"     Priority: {action.priority}, Wait: {action.wait_for_completion}")
-        print(f"{'─'*70}")
+        if verbose:
+            print("\n[Controller] Step 3: Mission Plan:")
+            print(f"{'─'*70}")
+            for idx, action in enumerate(mission_plan.actions, 1):
+                print(f"  {idx}. {action.action_type.upper()} → Drones {action.drone_ids}")
+                print(f"     Parameters: {action.parameters}")
+                print(f"     Priority: {action.priority}, Wait: {action.wait_for_completion}")
+            print(f"{'─'*70}")
 
         # Step 4: Execute if requested
         execution_result = None
         if execute:
-            print("\n[Controller] Step 4: Executing mission...")
-            execution_result = self.api_client.execute_mission(
+            if verbose:
+                print("\n[Controller] Step 4: Executing mission...")
+            execution_result = await self.api_client.aexecute_mission(
                 mission_plan,
                 feedback_callback=self._log_feedback
             )
-        else:
+        elif verbose:
             print("\n[Controller] Step 4: Skipping execution (dry-run mode)")
 
         # Step 5: Get final state and generate summary
-        print("\n[Controller] Step 5: Gathering results...")
-        final_state = self.api_client.get_state()
+        if verbose:
+            print("\n[Controller] Step 5: Gathering results...")
+        # execute_mission already fetched the post-mission state; a dry run changed nothing
+        final_state = execution_result["final_state"] if execution_result else current_state
         final_summary = self.env_translator.state_to_text(final_state) if final_state else "No final state"
 
         result = {
             "success": True,
             "command": user_command,
             "initial_state": current_state,
-            "mission_plan": mission_plan.dict(),
+            "mission_plan": mission_plan.model_dump(mode="json"),
             "execution_result": execution_result,
             "final_state": final_state,
             "final_summary": final_summary
         }
 
-        print(f"\n{'='*70}")
-        print("[Controller] Command Processing Complete")
-        print(f"{'='*70}\n")
+        if verbose:
+            print(f"\n{'='*70}")
+            print("[Controller] Command Processing Complete")
+            print(f"{'='*70}\n")
 
         return result
 
-    def _generate_plan(self, user_command: str, current_state: Optional[Dict]) -> MissionPlan:
+    async def _agenerate_plan(self, user_command: str, current_state: Optional[Dict]) -> MissionPlan:
+        """
+        Generate a plan in a worker thread without blocking the event loop.
+
+        With the plan cache enabled, a command that matches one already
+        being generated (same _plan_cache_key, so state snapshots fetched a
+        moment apart still match) waits for that result instead of calling
+        the LLM again.
+        """
+        if not self.plan_cache:
+            return await asyncio.to_thread(self._generate_plan, user_command, current_state)
+
+        key = self._plan_cache_key(user_command, current_state)
+        pending = self._inflight_plans.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(asyncio.to_thread(self._generate_plan, user_command, current_state, key))
+            self._inflight_plans[key] = pending
+            pending.add_done_callback(lambda _: self._inflight_plans.pop(key, None))
+            return await asyncio.shield(pending)
+
+        plan = await asyncio.shield(pending)
+        return plan.model_copy(deep=True)
+
+    def _generate_plan(self, user_command: str, current_state: Optional[Dict],
+                       cache_key: Optional[bytes] = None) -> MissionPlan:
         """
         Use LLM to generate structured mission plan from natural language.
 
         Args:
             user_command: User's natural language instruction
             current_state: Current simulation state for context
+            cache_key: Precomputed _plan_cache_key for this command and state
 
         Returns:
             Validated MissionPlan object
         """
+        if cache_key is None:
+            cache_key = self._plan_cache_key(user_command, current_state)
+        cached_plan = self._lookup_cached_plan(cache_key)
+        if cached_plan is not None:
+            mission_logger.info("[Controller] Reusing cached plan for this command")
+            return cached_plan
+
         # Build prompt with context
         state_context = ""
         if current_state:
             state_context = f"\nCurrent Swarm State:\n{self.env_translator.state_to_text(current_state)}\n"
 
-        full_prompt = f"""{self.system_prompt}
-
-{state_context}
-
-User Command: "{user_command}"
+        full_prompt = "".join([
+            self._prompt_prefix,
+            state_context,
+            _COMMAND_PROMPT.substitute(command=user_command)
+        ])
 
-Generate a MissionPlan in valid JSON format:"""
-
-        # Call LLM
-        response = self.model.generate_content(full_prompt)
-        response_text = response.text
+        # Call LLM, streaming so we can stop once the top-level JSON object closes
+        response_text = self._stream_completion(full_prompt)
 
         # Extract JSON from response (handle markdown code blocks)
         json_text = self._extract_json(response_text)
 
-        # Parse and validate
+        # Parse and validate in one pass (pydantic-core, no intermediate dict)
         try:
-            plan_dict = json.loads(json_text)
-            mission_plan = MissionPlan(**plan_dict)
-            return mission_plan
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Invalid JSON from LLM: {e}\nResponse: {json_text}")
-        except Exception as e:
-            raise ValueError(f"Invalid mission plan format: {e}\nData: {plan_dict}")
+            mission_plan = MissionPlan.model_validate_json(json_text)
+        except ValidationError as e:
+            if any(err["type"] == "json_invalid" for err in e.errors()):
+                raise ValueError(f"Invalid JSON from LLM: {e}\nResponse: {json_text}")
+            raise ValueError(f"Invalid mission plan format: {e}\nData: {json_text}")
+
+        self._store_cached_plan(cache_key, mission_plan)
+        return mission_plan
+
+    def _stream_completion(self, prompt: str) -> str:
+        """Stream a completion from the LLM and return the text received."""
+        buffer = io.StringIO()
+        scanner = _json_utils.JSONObjectScanner()
+
+        for chunk in self.model.generate_content(prompt, stream=True):
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunk without text parts (e.g. safety metadata)
+                continue
+
+            buffer.write(text)
+            if self.show_stream_progress:
+                print(f"\r[Controller] Receiving plan... {buffer.tell()} chars", end="", flush=True)
+            if scanner.feed(text):
+                break
+
+        if self.show_stream_progress:
+            print()
+        return buffer.getvalue()
+
+    @staticmethod
+    def _plan_cache_key(user_command: str, current_state: Optional[Dict] = None) -> bytes:
+        """
+        Hash a command (case and whitespace normalized) together with a coarse state summary.
+
+        The summary keeps what a plan depends on: which drones exist, whether
+        they are healthy, and positions rounded to the 0.01 m state_to_text shows.
+        Timestamp, velocity and battery change between every fetch, even while
+        hovering, so they are left out or a repeated command would never hit.
+        """
+        normalized = re.sub(r"\s+", " ", user_command.strip().lower())
+        digest = hashlib.blake2b(normalized.encode(), digest_size=16)
+        if current_state:
+            # "+ 0.0" folds -0.0 into 0.0 so jitter around zero doesn't change the key
+            summary = [
+                (d["id"], bool(d["healthy"]), [round(c, 2) + 0.0 for c in d["pos"]])
+                for d in current_state.get("drones") or ()
+            ]
+            digest.update(b"\0")
+            digest.update(json.dumps(summary, separators=(",", ":")).encode())
+        return digest.digest()
+
+    def _lookup_cached_plan(self, key: bytes) -> Optional[MissionPlan]:
+        """Return a copy of the unexpired cached plan for this key, if any."""
+        if not self.plan_cache:
+            return None
+
+        with self._plan_cache_lock:
+            entry = self._plan_cache.get(key)
+            if entry is None:
+                return None
+            stored_at, plan = entry
+            if time.monotonic() - stored_at > PLAN_CACHE_TTL:
+                del self._plan_cache[key]
+                return None
+            self._plan_cache.move_to_end(key)
+
+        return plan.model_copy(deep=True)
+
+    def _store_cached_plan(self, key: bytes, plan: MissionPlan):
+        """Remember a freshly generated plan, evicting the least recently used beyond the bound."""
+        if not self.plan_cache:
+            return
+
+        with self._plan_cache_lock:
+            self._plan_cache[key] = (time.monotonic(), plan)
+            self._plan_cache.move_to_end(key)
+            while len(self._plan_cache) > PLAN_CACHE_MAX_ENTRIES:
+                self._plan_cache.popitem(last=False)
 
     def _extract_json(self, text: str) -> str:
         """Extract JSON from LLM response, handling markdown code blocks."""
-        # Remove markdown code blocks if present
-        if "```json" in text:
-            text = text.split("```json")[1].split("```")[0]
-        elif "```" in text:
-            text = text.split("```")[1].split("```")[0]
-
-        return text.strip()
+        return _json_utils.extract_json(text)
 
     def _log_feedback(self, action, result, state):
         """Callback for logging feedback during mission execution."""
-        if state:
+        if state and mission_logger.isEnabledFor(logging.INFO):
             summary = self.env_translator.state_to_summary(state)
-            print(f"[Feedback] After {action.action_type}: {summary}")
+            mission_logger.info("[Feedback] After %s: %s", action.action_type, summary)
 
     def interactive_mode(self):
+        """
+        Run interactive command loop for testing (blocking wrapper around ainteractive_mode).
+        """
+        try:
+            self.api_client.run_sync(self.ainteractive_mode())
+        except KeyboardInterrupt:
+            print("\n[Controller] Interrupted by user")
+            print("\n[Controller] Goodbye!\n")
+
+    async def _ainput(self, prompt: str) -> str:
+        """Read a line from stdin without blocking the event loop."""
+        print(prompt, end="", flush=True)
+        loop = asyncio.get_running_loop()
+        line = loop.create_future()
+
+        def on_readable():
+            if not line.done():
+                line.set_result(sys.stdin.readline())
+
+        try:
+            loop.add_reader(sys.stdin.fileno(), on_readable)
+        except (NotImplementedError, io.UnsupportedOperation):
+            # No fd watching on this loop/stdin (e.g. Windows); use a worker thread
+            return await asyncio.to_thread(input)
+
+        try:
+            text = await line
+        finally:
+            loop.remove_reader(sys.stdin.fileno())
+        if not text:
+            raise EOFError
+        return text.rstrip("\n")
+
+    async def ainteractive_mode(self):
         """
         Run interactive command loop for testing.
+
+        Commands, state queries and prompt input share one event loop, so
+        the async connection pool stays open for the whole session.
         """
         print("\n" + "="*70)
         print("  Agentic Swarm Controller - Interactive Mode")
@@ -210,9 +438,12 @@ Generate a MissionPlan in valid JSON format:"""
         print('  "Land all drones"')
         print("="*70 + "\n")
 
+        self.show_stream_progress = True
+        mission_logger.setLevel(logging.INFO)
+
         while True:
             try:
-                user_input = input("\n🚁 Command> ").strip()
+                user_input = (await self._ainput("\n🚁 Command> ")).strip()
 
                 if not user_input:
                     continue
@@ -222,7 +453,7 @@ Generate a MissionPlan in valid JSON format:"""
                     break
 
                 if user_input.lower() == 'state':
-                    state = self.api_client.get_state()
+                    state = await self.api_client.aget_state()
                     if state:
                         print("\n" + self.env_translator.state_to_text(state))
                     else:
@@ -237,7 +468,7 @@ Generate a MissionPlan in valid JSON format:"""
                     print("[Controller] DRY RUN MODE - No execution")
 
                 # Process command
-                result = self.process_command(user_input, execute=execute)
+                result = await self.aprocess_command(user_input, execute=execute)
 
                 if not result["success"]:
                     print(f"\n❌ Error: {result.get('error', 'Unknown error')}")
@@ -247,8 +478,7 @@ Generate a MissionPlan in valid JSON format:"""
                     print(f"\n✓ Mission completed successfully")
                     print(f"   Success rate: {result['execution_result']['success_rate']:.1f}%")
 
-            except KeyboardInterrupt:
-                print("\n[Controller] Interrupted by user")
+            except EOFError:
                 break
             except Exception as e:
                 print(f"\n❌ Error: {str(e)}")
@@ -301,4 +531,7 @@ def example_individual_control():
 if __name__ == "__main__":
     # Run interactive mode by default
     controller = AgenticSwarmController()
-    controller.interactive_mode()
+    try:
+        controller.interactive_mode()
+    finally:
+        controller.close()
@@ -2,11 +2,111 @@
 API Translator: Converts structured drone actions to simulation API calls.
 """
 
-import requests
+import asyncio
+import atexit
+import logging
+import logging.handlers
+import queue
 import time
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any, Tuple
+
+import httpx
+import numpy as np
+
+try:
+    import uvloop
+except ImportError:  # pragma: no cover - optional speedup (not available on Windows)
+    uvloop = None
+
+import _json_utils
+from _state_kernels import reduce_state
 from translation_schema import DroneAction, MissionPlan
 
+# Mission/API log output. Records go through a queue and are written to
+# stderr by a background listener, so the mission loop never blocks on the
+# console. Defaults to WARNING; interactive and verbose runs raise it to INFO.
+logger = logging.getLogger("aus.mission")
+logger.setLevel(logging.WARNING)
+logger.propagate = False
+_log_queue: queue.Queue = queue.Queue(-1)
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+# Payloads are pre-encoded with orjson, so the content type is set by hand
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Health probe: a local simulator answers in well under a millisecond
+HEALTH_CHECK_TIMEOUT = 0.5  # seconds
+HEALTH_CACHE_TTL = 2.0  # seconds
+_health_cache: Dict[str, Tuple[float, bool]] = {}  # base_url -> (checked_at, healthy)
+
+# Completion detection for wait_for_completion actions
+SETTLE_POLL_INTERVAL = 0.02  # seconds between /state polls (50 Hz)
+SETTLE_SPEED = 0.05  # m/s; drones slower than this count as stopped
+SETTLE_TOLERANCE = 0.1  # meters from a known target position
+SETTLE_GRACE = 0.5  # seconds to wait for motion when the end position is unknown
+
+# Actions that must not overlap with anything before or after them
+BARRIER_ACTIONS = ("reset", "spawn")
+
+# action_type -> (endpoint, payload builder(parameters, ids_list))
+_ACTION_TABLE: Dict[str, Tuple[str, Callable[[Dict, List], Dict]]] = {
+    "takeoff": ("/takeoff", lambda p, ids: {"ids": ids, "altitude": p.get("altitude", 1.5)}),
+    "land": ("/land", lambda p, ids: {"ids": ids}),
+    "hover": ("/hover", lambda p, ids: {"ids": ids}),
+    "goto": ("/goto", lambda p, ids: {
+        "id": p.get("id", 0),
+        "x": p.get("x", 0.0),
+        "y": p.get("y", 0.0),
+        "z": p.get("z", 1.0),
+        "yaw": p.get("yaw", 0.0)
+    }),
+    "velocity": ("/velocity", lambda p, ids: {
+        "id": p.get("id", 0),
+        "vx": p.get("vx", 0.0),
+        "vy": p.get("vy", 0.0),
+        "vz": p.get("vz", 0.0),
+        "yaw_rate": p.get("yaw_rate", 0.0)
+    }),
+    # The response carries the swarm state, which doubles as feedback state
+    "formation": ("/formation?return_state=true", lambda p, ids: {
+        "pattern": p.get("pattern", "circle"),
+        "center": p.get("center", [0.0, 0.0, 1.5]),
+        "spacing": p.get("spacing", 1.0),
+        "radius": p.get("radius", 1.5),
+        "axis": p.get("axis", "x")
+    }),
+    "spawn": ("/spawn", lambda p, ids: {"num": p.get("num", 5)}),
+    "reset": ("/reset", lambda p, ids: {}),
+    "enable_hivemind": ("/hivemind/enable", lambda p, ids: {}),
+    "disable_hivemind": ("/hivemind/disable", lambda p, ids: {}),
+    "move_hivemind": ("/hivemind/move", lambda p, ids: {
+        "position": p.get("position", [0.0, 0.0, 1.0]),
+        "yaw": p.get("yaw", 0.0),
+        "scale": p.get("scale", 1.0)
+    }),
+}
+
+# Same, for goto/velocity actions carrying columnar {"ids": [...], ...} params
+_BATCH_ACTION_TABLE: Dict[str, Tuple[str, Callable[[Dict, List], Dict]]] = {
+    "goto": ("/goto_batch", lambda p, ids: {
+        "ids": p["ids"],
+        "x": p["x"],
+        "y": p["y"],
+        "z": p["z"],
+        "yaw": p.get("yaw", [])
+    }),
+    "velocity": ("/velocity_batch", lambda p, ids: {
+        "ids": p["ids"],
+        "vx": p["vx"],
+        "vy": p["vy"],
+        "vz": p["vz"],
+        "yaw_rate": p.get("yaw_rate", [])
+    }),
+}
+
 
 class SimulationAPIClient:
     """Client for interacting with the AUS-Lab simulation API."""
@@ -14,24 +114,90 @@ class SimulationAPIClient:
     def __init__(self, base_url: str = "http://localhost:8000"):
         self.base_url = base_url
         self.timeout = 5.0
+        self.limits = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+        self.headers = {"Connection": "keep-alive"}
+
+        # Persistent keep-alive pool for the blocking helpers
+        self._client = httpx.Client(
+            base_url=base_url, limits=self.limits, timeout=self.timeout, headers=self.headers
+        )
+
+        # Async pool is bound to the event loop that created it (see _get_aclient)
+        self._aclient: Optional[httpx.AsyncClient] = None
+        self._aclient_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_aclient(self) -> httpx.AsyncClient:
+        """Return the async client for the running event loop, creating it if needed."""
+        loop = asyncio.get_running_loop()
+        if self._aclient is None or self._aclient_loop is not loop:
+            self._aclient = httpx.AsyncClient(
+                base_url=self.base_url, limits=self.limits, timeout=self.timeout, headers=self.headers
+            )
+            self._aclient_loop = loop
+        return self._aclient
+
+    def close(self):
+        """Close the blocking connection pool."""
+        self._client.close()
+
+    async def aclose(self):
+        """Close the async connection pool."""
+        if self._aclient is not None:
+            await self._aclient.aclose()
+            self._aclient = None
+            self._aclient_loop = None
+
+    def run_sync(self, coro):
+        """Run a coroutine to completion from synchronous code."""
+        async def runner():
+            try:
+                return await coro
+            finally:
+                await self.aclose()
+
+        if uvloop is not None:
+            return uvloop.run(runner())
+        return asyncio.run(runner())
 
     def health_check(self) -> bool:
-        """Check if simulation API is available."""
+        """
+        Check if simulation API is available.
+
+        Results are cached per base URL for HEALTH_CACHE_TTL seconds, so
+        several clients created in a row only probe once.
+        """
+        cached = _health_cache.get(self.base_url)
+        if cached is not None and time.monotonic() - cached[0] < HEALTH_CACHE_TTL:
+            return cached[1]
+
         try:
-            response = requests.get(f"{self.base_url}/", timeout=self.timeout)
-            return response.status_code == 200
+            response = self._client.get("/", timeout=HEALTH_CHECK_TIMEOUT)
+            healthy = response.status_code == 200
         except Exception as e:
-            print(f"[API] Health check failed: {e}")
-            return False
+            logger.warning("[API] Health check failed: %s", e)
+            healthy = False
+
+        _health_cache[self.base_url] = (time.monotonic(), healthy)
+        return healthy
 
     def get_state(self) -> Optional[Dict[str, Any]]:
         """Get current state of all drones."""
         try:
-            response = requests.get(f"{self.base_url}/state", timeout=self.timeout)
+            response = self._client.get("/state")
             response.raise_for_status()
-            return response.json()
+            return _json_utils.loads(response.content)
         except Exception as e:
-            print(f"[API] Failed to get state: {e}")
+            logger.warning("[API] Failed to get state: %s", e)
+            return None
+
+    async def aget_state(self) -> Optional[Dict[str, Any]]:
+        """Get current state of all drones without blocking the event loop."""
+        try:
+            response = await self._get_aclient().get("/state")
+            response.raise_for_status()
+            return _json_utils.loads(response.content)
+        except Exception as e:
+            logger.warning("[API] Failed to get state: %s", e)
             return None
 
     def execute_action(self, action: DroneAction) -> Dict[str, Any]:
@@ -41,46 +207,63 @@ class SimulationAPIClient:
         Returns:
             Response dict with 'success', 'message', and 'data' fields
         """
-        print(f"\n[API] Executing: {action.action_type} for drones {action.drone_ids}")
-        print(f"[API] Parameters: {action.parameters}")
+        logger.info("[API] Executing: %s for drones %s", action.action_type, action.drone_ids)
+        logger.info("[API] Parameters: %s", action.parameters)
 
         try:
             # Map action type to endpoint and prepare request
             endpoint, payload = self._map_action_to_request(action)
 
             # Execute API call
-            response = requests.post(
-                f"{self.base_url}{endpoint}",
-                json=payload,
-                timeout=self.timeout
-            )
-            response.raise_for_status()
+            response = self._client.post(endpoint, content=_json_utils.dumps(payload), headers=JSON_HEADERS)
+            return self._action_result(response)
+
+        except Exception as e:
+            return self._action_error(e)
+
+    async def aexecute_action(self, action: DroneAction) -> Dict[str, Any]:
+        """
+        Execute a single drone action without blocking the event loop.
+
+        Returns:
+            Response dict with 'success', 'message', and 'data' fields
+        """
+        logger.info("[API] Executing: %s for drones %s", action.action_type, action.drone_ids)
+        logger.info("[API] Parameters: %s", action.parameters)
+
+        try:
+            endpoint, payload = self._map_action_to_request(action)
+            response = await self._get_aclient().post(endpoint, content=_json_utils.dumps(payload), headers=JSON_HEADERS)
+            return self._action_result(response)
 
-            result = response.json()
-            print(f"[API] ✓ Success: {result.get('message', 'OK')}")
-
-            return {
-                "success": True,
-                "message": result.get('message', 'Action completed'),
-                "data": result
-            }
-
-        except requests.exceptions.RequestException as e:
-            error_msg = f"API request failed: {str(e)}"
-            print(f"[API] ✗ Error: {error_msg}")
-            return {
-                "success": False,
-                "message": error_msg,
-                "data": None
-            }
         except Exception as e:
-            error_msg = f"Unexpected error: {str(e)}"
-            print(f"[API] ✗ Error: {error_msg}")
-            return {
-                "success": False,
-                "message": error_msg,
-                "data": None
-            }
+            return self._action_error(e)
+
+    def _action_result(self, response: httpx.Response) -> Dict[str, Any]:
+        """Convert an API response into an action result dict."""
+        response.raise_for_status()
+
+        result = _json_utils.loads(response.content)
+        logger.info("[API] ✓ Success: %s", result.get('message', 'OK'))
+
+        return {
+            "success": True,
+            "message": result.get('message', 'Action completed'),
+            "data": result
+        }
+
+    def _action_error(self, error: Exception) -> Dict[str, Any]:
+        """Convert an exception raised while executing an action into a result dict."""
+        if isinstance(error, httpx.HTTPError):
+            error_msg = f"API request failed: {str(error)}"
+        else:
+            error_msg = f"Unexpected error: {str(error)}"
+        logger.error("[API] ✗ Error: %s", error_msg)
+        return {
+            "success": False,
+            "message": error_msg,
+            "data": None
+        }
 
     def _map_action_to_request(self, action: DroneAction) -> tuple[str, Dict]:
         """
@@ -101,78 +284,249 @@ class SimulationAPIClient:
         else:
             ids_list = [ids]
 
-        # Map to API endpoints
-        if action_type == "takeoff":
-            return "/takeoff", {
-                "ids": ids_list,
-                "altitude": params.get("altitude", 1.5)
-            }
-
-        elif action_type == "land":
-            return "/land", {
-                "ids": ids_list
-            }
-
-        elif action_type == "hover":
-            return "/hover", {
-                "ids": ids_list
-            }
-
-        elif action_type == "goto":
-            return "/goto", {
-                "id": params.get("id", 0),
-                "x": params.get("x", 0.0),
-                "y": params.get("y", 0.0),
-                "z": params.get("z", 1.0),
-                "yaw": params.get("yaw", 0.0)
-            }
-
-        elif action_type == "velocity":
-            return "/velocity", {
-                "id": params.get("id", 0),
-                "vx": params.get("vx", 0.0),
-                "vy": params.get("vy", 0.0),
-                "vz": params.get("vz", 0.0),
-                "yaw_rate": params.get("yaw_rate", 0.0)
-            }
-
-        elif action_type == "formation":
-            return "/formation", {
-                "pattern": params.get("pattern", "circle"),
-                "center": params.get("center", [0.0, 0.0, 1.5]),
-                "spacing": params.get("spacing", 1.0),
-                "radius": params.get("radius", 1.5),
-                "axis": params.get("axis", "x")
-            }
-
-        elif action_type == "spawn":
-            return "/spawn", {
-                "num": params.get("num", 5)
-            }
-
-        elif action_type == "reset":
-            return "/reset", {}
-
-        elif action_type == "enable_hivemind":
-            return "/hivemind/enable", {}
-
-        elif action_type == "disable_hivemind":
-            return "/hivemind/disable", {}
-
-        elif action_type == "move_hivemind":
-            return "/hivemind/move", {
-                "position": params.get("position", [0.0, 0.0, 1.0]),
-                "yaw": params.get("yaw", 0.0),
-                "scale": params.get("scale", 1.0)
-            }
-
-        else:
+        # Map to API endpoints (columnar params go to the batch endpoints)
+        table = _BATCH_ACTION_TABLE if "ids" in params and action_type in _BATCH_ACTION_TABLE else _ACTION_TABLE
+        try:
+            endpoint, build = table[action_type]
+        except KeyError:
             raise ValueError(f"Unknown action type: {action_type}")
+        return endpoint, build(params, ids_list)
+
+    # Columns sent by /goto_batch and /velocity_batch, with per-drone defaults
+    BATCH_COLUMNS = {
+        "goto": {"x": 0.0, "y": 0.0, "z": 1.0, "yaw": 0.0},
+        "velocity": {"vx": 0.0, "vy": 0.0, "vz": 0.0, "yaw_rate": 0.0},
+    }
+
+    # Actions whose repeat, sent right after the first, changes nothing
+    IDEMPOTENT_ACTIONS = ("formation", "goto", "takeoff", "land")
+
+    @staticmethod
+    def _same_command(a: DroneAction, b: DroneAction) -> bool:
+        """True if two actions would send the same request and wait the same way."""
+        return (a.action_type == b.action_type and a.drone_ids == b.drone_ids
+                and a.parameters == b.parameters and a.wait_for_completion == b.wait_for_completion)
+
+    def _coalesce_actions(self, actions: List[DroneAction]) -> List[Tuple[DroneAction, List[DroneAction]]]:
+        """
+        Collapse runs of same-type goto/velocity actions into one batched action,
+        and back-to-back repeats of an idempotent action into a single request.
+
+        Only actions with wait_for_completion=False are merged. The merged
+        action carries columnar parameters ({"ids": [...], "x": [...], ...})
+        and is sent to the matching *_batch endpoint. Columns are NumPy arrays
+        so the encoder can serialize them without building per-element lists.
+
+        Returns:
+            List of (action_to_dispatch, original_actions) pairs
+        """
+        runs: List[List[DroneAction]] = []
+        for action in actions:
+            batchable = action.action_type in self.BATCH_COLUMNS and not action.wait_for_completion
+            if (batchable and runs
+                    and runs[-1][-1].action_type == action.action_type
+                    and not runs[-1][-1].wait_for_completion):
+                runs[-1].append(action)
+            else:
+                runs.append([action])
+
+        dispatch = []
+        for run in runs:
+            if len(run) == 1:
+                action = run[0]
+                if (action.action_type in self.IDEMPOTENT_ACTIONS and dispatch
+                        and dispatch[-1][0] is dispatch[-1][1][0]  # previous was not a merged batch
+                        and self._same_command(dispatch[-1][0], action)):
+                    dispatch[-1][1].append(action)
+                else:
+                    dispatch.append((action, run))
+                continue
+
+            columns = self.BATCH_COLUMNS[run[0].action_type]
+            ids = [a.parameters.get("id", 0) for a in run]
+            parameters = {"ids": np.array(ids, dtype=np.int32)}
+            for key, default in columns.items():
+                parameters[key] = np.fromiter(
+                    (a.parameters.get(key, default) for a in run), dtype=np.float32, count=len(run)
+                )
+
+            # Built from already-validated actions, so skip re-validation
+            merged = DroneAction.model_construct(
+                action_type=run[0].action_type,
+                drone_ids=ids,
+                parameters=parameters,
+                priority=run[0].priority,
+                wait_for_completion=False
+            )
+            dispatch.append((merged, run))
+
+        return dispatch
+
+    @staticmethod
+    def _action_targets(action: DroneAction) -> Optional[set]:
+        """
+        Resolve the set of drone IDs an action touches.
+
+        Returns:
+            Set of drone IDs, or None if the action affects the whole swarm
+        """
+        if action.action_type in ("goto", "velocity"):
+            if "ids" in action.parameters:
+                return set(action.parameters["ids"])
+            return {action.parameters.get("id", 0)}
+        if action.drone_ids == "all":
+            return None
+        return set(action.drone_ids)
+
+    def _build_waves(self, actions: List[DroneAction]) -> List[List[DroneAction]]:
+        """
+        Schedule an ordered action list into waves of independent actions.
+
+        An action depends on an earlier one when their target drones overlap
+        (whole-swarm actions overlap everything). Actions with
+        wait_for_completion, and reset/spawn, are full barriers: they run
+        alone, after everything before them and before everything after.
+        Each action lands in the first wave after all of its dependencies,
+        so a wave can be dispatched with a single asyncio.gather.
+        """
+        waves: List[List[DroneAction]] = []
+        last_wave: Dict[int, int] = {}  # drone ID -> last wave that touched it
+        floor = 0  # earliest wave the next action may join
+
+        for action in actions:
+            if action.wait_for_completion or action.action_type in BARRIER_ACTIONS:
+                waves.append([action])
+                last_wave.clear()
+                floor = len(waves)
+                continue
+
+            targets = self._action_targets(action)
+            if targets is None:
+                wave = len(waves)
+                floor = wave + 1
+            else:
+                wave = max([floor] + [last_wave[d] + 1 for d in targets if d in last_wave])
+                for drone_id in targets:
+                    last_wave[drone_id] = wave
+
+            if wave == len(waves):
+                waves.append([])
+            waves[wave].append(action)
+
+        return waves
+
+    @staticmethod
+    def _settle_targets(action: DroneAction) -> Optional[Dict[Optional[int], Tuple]]:
+        """
+        Expected final (x, y, z) per drone for actions with a known end position.
+
+        A None key applies to every drone; None components are not checked.
+
+        Returns:
+            Dict of drone ID -> target tuple, or None if the end position is not known here
+        """
+        params = action.parameters
+        ids = None if action.drone_ids == "all" else action.drone_ids
+
+        if action.action_type == "goto":
+            if "ids" in params:
+                return {i: (x, y, z) for i, x, y, z in zip(params["ids"], params["x"], params["y"], params["z"])}
+            return {params.get("id", 0): (params.get("x", 0.0), params.get("y", 0.0), params.get("z", 1.0))}
+
+        if action.action_type in ("takeoff", "land"):
+            altitude = params.get("altitude", 1.5) if action.action_type == "takeoff" else 0.05
+            return {i: (None, None, altitude) for i in (ids if ids is not None else [None])}
+
+        return None
+
+    async def _wait_until_settled(self, action: DroneAction, deadline: float) -> bool:
+        """
+        Poll /state until the drones targeted by an action have settled.
+
+        Settled means every targeted drone is below SETTLE_SPEED and, when the
+        end position is known, within SETTLE_TOLERANCE of it. Without a known
+        end position the swarm must have been seen moving first (or be still
+        after SETTLE_GRACE seconds).
+
+        Returns:
+            True if the drones settled before the deadline, False on timeout
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        ids = self._action_targets(action)
+        targets = self._settle_targets(action)
+        moved = False
+
+        while loop.time() < deadline:
+            await asyncio.sleep(SETTLE_POLL_INTERVAL)
+            state = await self.aget_state()
+            if not state or not state.get("drones"):
+                continue
+
+            drones = [d for d in state["drones"] if ids is None or d["id"] in ids]
+            if not drones:
+                continue
+
+            velocities = np.array([d["vel"] for d in drones], dtype=np.float64)
+            if np.max(np.linalg.norm(velocities, axis=1)) >= SETTLE_SPEED:
+                moved = True
+                continue
+
+            if targets is None:
+                if moved or loop.time() - start >= SETTLE_GRACE:
+                    return True
+                continue
+
+            if all(self._at_target(d["pos"], targets.get(d["id"], targets.get(None))) for d in drones):
+                return True
+
+        return False
+
+    @staticmethod
+    def _at_target(pos: List[float], target: Optional[Tuple]) -> bool:
+        """Check a position against a (possibly partial) target tuple."""
+        if target is None:
+            return True
+        return all(t is None or abs(p - t) <= SETTLE_TOLERANCE for p, t in zip(pos, target))
+
+    async def _afeedback(self, actions: List[DroneAction], results: List[Dict[str, Any]],
+                         feedback_callback, reuse_response_state: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Report state for every action of a dispatched batch, and return it.
+
+        A single action whose response already carries the swarm state (e.g.
+        /formation) reuses it instead of fetching /state again.
+        """
+        state = None
+        if reuse_response_state and len(results) == 1:
+            state = (results[0].get("data") or {}).get("state")
+        if state is None:
+            state = await self.aget_state()
+        for action, result in zip(actions, results):
+            feedback_callback(action, result, state)
+        return state
 
     def execute_mission(self, mission: MissionPlan, feedback_callback=None) -> Dict[str, Any]:
+        """
+        Execute a complete mission plan (blocking wrapper around aexecute_mission).
+
+        Args:
+            mission: MissionPlan with ordered actions
+            feedback_callback: Optional function(action, result, state) called after each action
+
+        Returns:
+            Dict with mission results and execution summary
+        """
+        return self.run_sync(self.aexecute_mission(mission, feedback_callback))
+
+    async def aexecute_mission(self, mission: MissionPlan, feedback_callback=None) -> Dict[str, Any]:
         """
         Execute a complete mission plan.
 
+        Independent actions (disjoint drones, no wait_for_completion) are
+        dispatched concurrently, and feedback state is fetched in the
+        background while the next action is sent.
+
         Args:
             mission: MissionPlan with ordered actions
             feedback_callback: Optional function(action, result, state) called after each action
@@ -180,55 +534,86 @@ class SimulationAPIClient:
         Returns:
             Dict with mission results and execution summary
         """
-        print(f"\n{'='*60}")
-        print(f"[MISSION] Starting: {mission.mission_name}")
-        print(f"[MISSION] Total actions: {len(mission.actions)}")
-        print(f"{'='*60}\n")
+        logger.info("[MISSION] Starting: %s (%d actions)", mission.mission_name, len(mission.actions))
 
-        results = []
+        # (action, result, timestamp) per plan step; serialized once at the end
+        results: List[Optional[Tuple[DroneAction, Dict[str, Any], float]]] = [None] * len(mission.actions)
         successful_actions = 0
         start_time = time.time()
-
-        for idx, action in enumerate(mission.actions, 1):
-            print(f"\n[MISSION] Step {idx}/{len(mission.actions)}")
-
-            # Execute action
-            result = self.execute_action(action)
-            results.append({
-                "action": action.dict(),
-                "result": result,
-                "timestamp": time.time() - start_time
-            })
-
-            if not result["success"]:
-                print(f"[MISSION] ✗ Action failed, checking abort conditions...")
-                if mission.abort_conditions:
-                    print(f"[MISSION] Aborting mission due to failure")
-                    break
+        feedback_tasks = []
+        step = 0
+        aborted = False
+
+        # Merge goto/velocity runs into batched requests, remembering the originals
+        dispatch = self._coalesce_actions(mission.actions)
+        members = {id(action): originals for action, originals in dispatch}
+        plan_index = {id(action): idx for idx, action in enumerate(mission.actions)}
+
+        for wave in self._build_waves([action for action, _ in dispatch]):
+            wave_size = sum(len(members[id(action)]) for action in wave)
+            if wave_size == 1:
+                logger.info("[MISSION] Step %d/%d", step + 1, len(mission.actions))
             else:
-                successful_actions += 1
-
-            # Wait for completion if specified
-            if action.wait_for_completion and action.expected_duration:
-                print(f"[MISSION] Waiting {action.expected_duration}s for completion...")
-                time.sleep(action.expected_duration)
-
-            # Get current state for feedback
+                logger.info("[MISSION] Steps %d-%d/%d (%d independent actions)",
+                            step + 1, step + wave_size, len(mission.actions), wave_size)
+
+            # Execute action(s)
+            wave_results = await asyncio.gather(*(self.aexecute_action(action) for action in wave))
+
+            # Report per original action so counts line up with the plan
+            reported_actions = []
+            reported_results = []
+            for action, result in zip(wave, wave_results):
+                for original in members[id(action)]:
+                    results[plan_index[id(original)]] = (original, result, time.time() - start_time)
+                    step += 1
+                    reported_actions.append(original)
+                    reported_results.append(result)
+
+                    if not result["success"]:
+                        logger.warning("[MISSION] ✗ Action failed, checking abort conditions...")
+                        if mission.abort_conditions:
+                            aborted = True
+                    else:
+                        successful_actions += 1
+
+            if aborted:
+                logger.warning("[MISSION] Aborting mission due to failure")
+                break
+
+            # Wait for completion if specified (expected_duration is the upper bound)
+            action = wave[-1]
+            waited = bool(action.wait_for_completion and action.expected_duration)
+            if waited:
+                logger.info("[MISSION] Waiting up to %ss for completion...", action.expected_duration)
+                loop = asyncio.get_running_loop()
+                settle_start = loop.time()
+                settled = await self._wait_until_settled(action, settle_start + action.expected_duration)
+                if settled:
+                    logger.info("[MISSION] Settled after %.2fs", loop.time() - settle_start)
+
+            # Get current state for feedback while the next action is dispatched
             if feedback_callback:
-                state = self.get_state()
-                feedback_callback(action, result, state)
-
-            # Small delay between actions
-            time.sleep(0.5)
+                feedback_tasks.append(asyncio.create_task(
+                    self._afeedback(reported_actions, reported_results, feedback_callback,
+                                    reuse_response_state=not waited)
+                ))
+
+        # The feedback fetched after the last wave already is the final state
+        final_state = None
+        if feedback_tasks:
+            feedback_states = await asyncio.gather(*feedback_tasks)
+            if not aborted:
+                final_state = feedback_states[-1]
+        if final_state is None:
+            final_state = await self.aget_state()
 
         total_time = time.time() - start_time
         success_rate = successful_actions / len(mission.actions) * 100
 
-        print(f"\n{'='*60}")
-        print(f"[MISSION] Complete: {mission.mission_name}")
-        print(f"[MISSION] Success Rate: {success_rate:.1f}% ({successful_actions}/{len(mission.actions)})")
-        print(f"[MISSION] Total Time: {total_time:.2f}s")
-        print(f"{'='*60}\n")
+        logger.info("[MISSION] Complete: %s", mission.mission_name)
+        logger.info("[MISSION] Success Rate: %.1f%% (%d/%d)", success_rate, successful_actions, len(mission.actions))
+        logger.info("[MISSION] Total Time: %.2fs", total_time)
 
         return {
             "mission_name": mission.mission_name,
@@ -236,8 +621,11 @@ class SimulationAPIClient:
             "successful_actions": successful_actions,
             "success_rate": success_rate,
             "total_time": total_time,
-            "results": results,
-            "final_state": self.get_state()
+            "results": [
+                {"action": action.model_dump(mode="json"), "result": result, "timestamp": timestamp}
+                for action, result, timestamp in filter(None, results)
+            ],
+            "final_state": final_state
         }
 
 
@@ -279,9 +667,14 @@ class EnvironmentTranslator:
             return "No drones active."
 
         drones = state["drones"]
-        avg_altitude = sum(d["pos"][2] for d in drones) / len(drones)
-        avg_battery = sum(d["battery"] for d in drones) / len(drones)
-        healthy_count = sum(1 for d in drones if d["healthy"])
+        if not drones:
+            return "No drones active."
+
+        # One pass over the drone dicts into (altitude, battery, healthy) rows, then
+        # transposed to contiguous columns for the reduction
+        columns = np.array([(d["pos"][2], d["battery"], d["healthy"]) for d in drones], dtype=np.float64).T.copy()
+
+        avg_altitude, avg_battery, healthy_count = reduce_state(columns[0], columns[1], columns[2] != 0)
 
         return (
             f"{len(drones)} drones active, "
@@ -5,6 +5,7 @@ Simple command-line interface for LLM-driven swarm control.
 """
 
 import argparse
+import logging
 import sys
 from agentic_controller import AgenticSwarmController
 
@@ -72,6 +73,9 @@ Examples:
 
     args = parser.parse_args()
 
+    if args.verbose:
+        logging.getLogger("aus.mission").setLevel(logging.INFO)
+
     # Initialize controller
     try:
         controller = AgenticSwarmController(
@@ -85,6 +89,14 @@ Examples:
         print("  2. Ensure simulation is running: cd ../simulation && python main.py")
         return 1
 
+    try:
+        return run(controller, args)
+    finally:
+        controller.close()
+
+
+def run(controller: AgenticSwarmController, args) -> int:
+    """Execute a single command or start interactive mode."""
     # Execute based on mode
     if args.command:
         # Single command mode
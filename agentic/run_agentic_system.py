@@ -1,19 +1,8 @@
-
 import sys
-import os
-from dotenv import load_dotenv
-import agentic_system
-
-# Load the .env file from the parent directory
-load_dotenv(dotenv_path="../.env")
-
-# Configure the Gemini API key
-api_key = os.getenv("GEMINI_API_KEY")
-if not api_key:
-    print("Error: GEMINI_API_KEY not found in .env file")
-    sys.exit(1)
+from agentic_controller import AgenticSwarmController
 
-agentic_system.genai.configure(api_key=api_key)
+# Plans are built by AgenticSwarmController, the single prompt builder;
+# it loads GEMINI_API_KEY from ../.env and configures Gemini itself.
 
 if __name__ == "__main__":
     if len(sys.argv) > 1:
@@ -21,5 +10,15 @@ if __name__ == "__main__":
     else:
         command = "Survey the north side of the map and report unusual activity."
 
-    plan = agentic_system.agentic_system(command)
-    print("Structured Plan:", plan)
+    try:
+        controller = AgenticSwarmController()
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    try:
+        result = controller.process_command(command, execute=False)
+    finally:
+        controller.close()
+
+    print("Structured Plan:", result.get("mission_plan", result.get("error")))
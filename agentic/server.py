@@ -1,9 +1,42 @@
-from fastapi import FastAPI
+import asyncio
+import functools
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, Dict
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+import _json_utils
 from agentic_controller import AgenticSwarmController
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI()
+# Seconds between keep-alive status events on a command stream
+STREAM_HEARTBEAT = 1.0
+
+# Seconds a finished command's result is kept for a client that never claims it
+JOB_RESULT_TTL = 300.0
+
+controller: AgenticSwarmController = None
+
+# In-flight and unclaimed commands by task ID
+jobs: Dict[str, asyncio.Task] = {}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the controller once; every request shares its connection pools."""
+    global controller
+    controller = AgenticSwarmController(verbose=False)
+    yield
+    pending = list(jobs.values())
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    await controller.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -13,17 +46,77 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-controller = AgenticSwarmController()
-
 class CommandRequest(BaseModel):
     command: str
 
+
+def _get_job(task_id: str) -> asyncio.Task:
+    try:
+        return jobs[task_id]
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown task: {task_id}")
+
+
+def _expire_job(task_id: str, task: asyncio.Task):
+    """Done callback: forget the job after JOB_RESULT_TTL if nobody has claimed it."""
+    asyncio.get_running_loop().call_later(JOB_RESULT_TTL, jobs.pop, task_id, None)
+
+
+def _job_status(task_id: str, task: asyncio.Task) -> Dict[str, Any]:
+    """Status payload for a job; finished jobs are handed out once and forgotten."""
+    if not task.done():
+        return {"task_id": task_id, "status": "pending"}
+
+    jobs.pop(task_id, None)
+    if task.cancelled():
+        return {"task_id": task_id, "status": "failed", "error": "Cancelled"}
+    if task.exception() is not None:
+        return {"task_id": task_id, "status": "failed", "error": str(task.exception())}
+    return {"task_id": task_id, "status": "done", "result": task.result()}
+
+
 @app.post("/command")
 async def process_command(request: CommandRequest):
-    result = controller.process_command(request.command)
-    return result
+    """Start processing a command in the background and return its task ID."""
+    task_id = uuid.uuid4().hex
+    task = asyncio.create_task(controller.aprocess_command(request.command))
+    task.add_done_callback(functools.partial(_expire_job, task_id))
+    jobs[task_id] = task
+    return {"task_id": task_id}
+
+@app.get("/command/{task_id}")
+async def command_result(task_id: str, timeout: float = 10.0):
+    """Wait up to `timeout` seconds for a command; returns its result or a pending status."""
+    task = _get_job(task_id)
+    await asyncio.wait({task}, timeout=timeout)
+    return _job_status(task_id, task)
+
+@app.get("/command/{task_id}/stream")
+async def command_stream(task_id: str):
+    """Server-sent events: `status` heartbeats while pending, then one `result` event."""
+    task = _get_job(task_id)
+
+    async def events():
+        while True:
+            await asyncio.wait({task}, timeout=STREAM_HEARTBEAT)
+            status = _job_status(task_id, task)
+            data = _json_utils.dumps(status).decode()
+            if status["status"] == "pending":
+                yield f"event: status\ndata: {data}\n\n"
+            else:
+                yield f"event: result\ndata: {data}\n\n"
+                return
+
+    return StreamingResponse(events(), media_type="text/event-stream")
 
 @app.get("/state")
 async def get_state():
-    state = controller.api_client.get_state()
+    state = await controller.api_client.aget_state()
     return state
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # uvloop + httptools (from uvicorn[standard]); plain asyncio/h11 if they are missing
+    uvicorn.run(app, host="0.0.0.0", port=8001, loop="auto", http="auto")
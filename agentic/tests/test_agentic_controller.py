@@ -1,10 +1,12 @@
+import asyncio
 import pytest
 from unittest.mock import patch, MagicMock
-from agentic.agentic_controller import AgenticSwarmController
+from agentic.agentic_controller import AgenticSwarmController, _get_model
 
 @patch('agentic.agentic_controller.SimulationAPIClient')
 @patch('agentic.agentic_controller.genai.GenerativeModel')
 def test_agentic_controller_initialization(mock_genai_model, mock_api_client):
+    _get_model.cache_clear()
     # Mock the API client's health_check to return True
     mock_api_client.return_value.health_check.return_value = True
     
@@ -15,3 +17,80 @@ def test_agentic_controller_initialization(mock_genai_model, mock_api_client):
         assert controller.model is not None
     except Exception as e:
         pytest.fail(f"AgenticSwarmController initialization failed with an exception: {e}")
+
+
+@patch('agentic.agentic_controller.SimulationAPIClient')
+@patch('agentic.agentic_controller.genai.GenerativeModel')
+def test_generate_plan_reuses_cached_plan(mock_genai_model, mock_api_client):
+    _get_model.cache_clear()
+    mock_api_client.return_value.health_check.return_value = True
+    mock_genai_model.return_value.generate_content.return_value = [
+        MagicMock(text='```json\n{"mission_name": "Land", '),
+        MagicMock(text='"actions": [{"action_type": "land"}]}'),
+        MagicMock(text='\n```'),
+    ]
+
+    controller = AgenticSwarmController()
+    first = controller._generate_plan("Land all drones", None)
+    second = controller._generate_plan("  land ALL drones ", None)
+
+    assert mock_genai_model.return_value.generate_content.call_count == 1
+    assert second == first
+    assert second is not first
+
+
+def _hover_state(jitter, battery, timestamp):
+    return {
+        "timestamp": timestamp,
+        "drones": [
+            {"id": i, "pos": [i + jitter, -jitter, 1.5 + jitter], "vel": [jitter, -jitter, 0.0],
+             "yaw": 0.0, "battery": battery, "healthy": True}
+            for i in range(3)
+        ],
+    }
+
+
+@patch('agentic.agentic_controller.SimulationAPIClient')
+@patch('agentic.agentic_controller.genai.GenerativeModel')
+def test_cached_plan_survives_state_jitter(mock_genai_model, mock_api_client):
+    _get_model.cache_clear()
+    mock_api_client.return_value.health_check.return_value = True
+    mock_genai_model.return_value.generate_content.return_value = [
+        MagicMock(text='{"mission_name": "Land", "actions": [{"action_type": "land"}]}'),
+    ]
+
+    controller = AgenticSwarmController()
+    controller._generate_plan("Land all drones", _hover_state(0.0011, 97.3, 12.0))
+    controller._generate_plan("Land all drones", _hover_state(-0.0008, 96.9, 13.0))
+    assert mock_genai_model.return_value.generate_content.call_count == 1
+
+    # A drone that actually moved is a different situation
+    moved = _hover_state(0.0, 97.0, 14.0)
+    moved["drones"][0]["pos"][2] = 2.5
+    controller._generate_plan("Land all drones", moved)
+    assert mock_genai_model.return_value.generate_content.call_count == 2
+
+
+@patch('agentic.agentic_controller.SimulationAPIClient')
+@patch('agentic.agentic_controller.genai.GenerativeModel')
+def test_concurrent_identical_commands_share_one_generation(mock_genai_model, mock_api_client):
+    _get_model.cache_clear()
+    mock_api_client.return_value.health_check.return_value = True
+    mock_genai_model.return_value.generate_content.return_value = [
+        MagicMock(text='{"mission_name": "Land", "actions": [{"action_type": "land"}]}'),
+    ]
+
+    controller = AgenticSwarmController()
+
+    async def generate_both():
+        return await asyncio.gather(
+            controller._agenerate_plan("Land all drones", _hover_state(0.0012, 88.4, 30.0)),
+            controller._agenerate_plan("land all drones", _hover_state(-0.0004, 88.1, 30.1)),
+        )
+
+    first, second = asyncio.run(generate_both())
+
+    assert mock_genai_model.return_value.generate_content.call_count == 1
+    assert second == first
+    assert second is not first
+    assert not controller._inflight_plans
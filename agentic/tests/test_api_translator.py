@@ -0,0 +1,57 @@
+from agentic import _json_utils
+from agentic.api_translator import SimulationAPIClient
+from translation_schema import DroneAction
+
+
+def _goto(drone_id, wait=False):
+    return DroneAction(action_type="goto", drone_ids=[drone_id],
+                       parameters={"id": drone_id, "x": 1.0, "y": 1.0, "z": 1.0},
+                       wait_for_completion=wait)
+
+
+def _circle():
+    return DroneAction(action_type="formation", parameters={"pattern": "circle"})
+
+
+def test_build_waves_schedules_independent_actions_together():
+    client = SimulationAPIClient()
+    first, repeat, other = _goto(0), _goto(0), _goto(1)
+    land = DroneAction(action_type="land", drone_ids="all", wait_for_completion=False)
+    barrier = _goto(2, wait=True)
+
+    waves = client._build_waves([first, repeat, other, land, barrier, _goto(3)])
+
+    # drone 1 does not depend on the repeated goto for drone 0
+    assert waves[0] == [first, other]
+    assert waves[1] == [repeat]
+    assert waves[2] == [land]
+    assert waves[3] == [barrier]
+    assert len(waves) == 5
+    client.close()
+
+
+def test_coalesce_actions_merges_goto_runs():
+    client = SimulationAPIClient()
+    actions = [_goto(0), _goto(1), _goto(2, wait=True)]
+
+    dispatch = client._coalesce_actions(actions)
+
+    assert len(dispatch) == 2
+    merged, originals = dispatch[0]
+    assert originals == actions[:2]
+    endpoint, payload = client._map_action_to_request(merged)
+    assert endpoint == "/goto_batch"
+    assert _json_utils.loads(_json_utils.dumps(payload)) == {
+        "ids": [0, 1], "x": [1.0, 1.0], "y": [1.0, 1.0], "z": [1.0, 1.0], "yaw": [0.0, 0.0]
+    }
+    client.close()
+
+
+def test_coalesce_actions_drops_repeated_formation():
+    client = SimulationAPIClient()
+    actions = [_circle(), _circle(), _goto(0, wait=True)]
+
+    dispatch = client._coalesce_actions(actions)
+
+    assert [originals for _, originals in dispatch] == [actions[:2], actions[2:]]
+    client.close()
@@ -3,6 +3,7 @@ Translation Schema for LLM → Simulation API
 Defines the structured format for converting LLM intentions to API calls.
 """
 
+import json
 from typing import Literal, List, Optional, Union, Dict, Any
 from pydantic import BaseModel, Field
 
@@ -298,3 +299,7 @@ Example Output:
   ]
 }}
 """
+
+
+# System prompt with the action templates filled in, rendered once at import
+RENDERED_SYSTEM_PROMPT = LLM_SYSTEM_PROMPT.format(action_templates=json.dumps(ACTION_TEMPLATES, indent=2))
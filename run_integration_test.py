@@ -1,9 +1,14 @@
 import os
+import signal
 import subprocess
 import time
-import requests
+import httpx
 import sys
 
+API_BASE = "http://localhost:8000"
+STARTUP_TIMEOUT = 30.0  # seconds
+STARTUP_POLL_INTERVAL = 0.05  # seconds
+
 def run_command(command, cwd):
     print(f"Running command: {' '.join(command)}")
     process = subprocess.Popen(command, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
@@ -15,50 +20,84 @@ def run_command(command, cwd):
         sys.exit(1)
     return stdout.decode('utf-8')
 
+def stop_simulation(process):
+    """Stop the simulation and anything it spawned: SIGTERM, then SIGKILL after 3s."""
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        return
+    try:
+        process.wait(timeout=3)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+
+def wait_for_api(client, process, timeout=STARTUP_TIMEOUT):
+    """Poll the API until the swarm is running; False on timeout or if the simulation exits."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and process.poll() is None:
+        try:
+            if client.get("/", timeout=0.5).json().get("status") == "running":
+                return True
+        except (httpx.HTTPError, ValueError):
+            pass
+        time.sleep(STARTUP_POLL_INTERVAL)
+    return False
+
 def main():
     print("=== AUS-Lab Integration Test ===")
     
     # Start simulation in background
     print("\n1. Starting simulation in background...")
-    sim_process = subprocess.Popen([sys.executable, "main.py", "--headless"], cwd="simulation", stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    time.sleep(5)
+    # Unbuffered binary log: the child writes straight to the file, and the
+    # parent drops its copy of the fd (an undrained PIPE could stall the child)
+    with open("simulation.log", "wb", buffering=0) as log_file:
+        sim_process = subprocess.Popen([sys.executable, "main.py", "--headless"], cwd="simulation", stdout=log_file, stderr=subprocess.STDOUT, start_new_session=True)
+
+    # One keep-alive connection for every API call below
+    client = httpx.Client(base_url=API_BASE, timeout=5.0)
+
+    if not wait_for_api(client, sim_process):
+        print("   ✗ Simulation did not start (see simulation.log)")
+        stop_simulation(sim_process)
+        sys.exit(1)
 
     # Test API
     print("\n2. Testing API...")
     try:
-        response = requests.get("http://localhost:8000/")
+        response = client.get("/")
         response.raise_for_status()
         if "AUS-Lab" in response.text:
             print("   ✓ API is responding")
         else:
             print("   ✗ API not responding")
-            sim_process.kill()
+            stop_simulation(sim_process)
             sys.exit(1)
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"   ✗ API not responding: {e}")
-        sim_process.kill()
+        stop_simulation(sim_process)
         sys.exit(1)
 
     # Test drone commands
     print("\n3. Testing drone commands...")
     try:
-        response = requests.post("http://localhost:8000/takeoff", json={"ids": ["all"], "altitude": 1.5})
+        response = client.post("/takeoff", json={"ids": ["all"], "altitude": 1.5})
         response.raise_for_status()
         if response.json().get("success"):
             print("   ✓ Takeoff command accepted")
         else:
             print("   ✗ Takeoff command failed")
-            sim_process.kill()
+            stop_simulation(sim_process)
             sys.exit(1)
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"   ✗ Takeoff command failed: {e}")
-        sim_process.kill()
+        stop_simulation(sim_process)
         sys.exit(1)
 
     # Cleanup
     print("\n4. Cleaning up...")
-    sim_process.kill()
-    time.sleep(2)
+    client.close()
+    stop_simulation(sim_process)
 
     print("\n===================================")
     print("✓ All tests passed!")
@@ -2,8 +2,26 @@
 Pydantic models for API request/response validation.
 """
 
-from typing import List, Union, Literal
-from pydantic import BaseModel, Field, field_validator, ConfigDict
+import math
+from typing import Annotated, List, Optional, Tuple, Union, Literal
+from pydantic import BaseModel, Field, TypeAdapter, model_validator, ConfigDict
+
+
+# Shared by every request that targets a set of drones. The union already guarantees
+# a list of ints or a list of "all"; the length limit pins the latter to exactly ['all'],
+# so no per-element Python check is needed.
+DroneIds = Union[List[int], Annotated[List[Literal["all"]], Field(min_length=1, max_length=1)]]
+
+# Bounds enforced natively by pydantic-core (no Python validator callback)
+Coordinate = Annotated[float, Field(ge=-10.0, le=10.0)]
+Altitude = Annotated[float, Field(ge=0.1, le=5.0)]
+VelocityComponent = Annotated[float, Field(ge=-5.0, le=5.0)]
+YawRate = Annotated[float, Field(ge=-2 * math.pi, le=2 * math.pi)]
+DroneId = Annotated[int, Field(ge=0)]
+
+# Formation choices, defined once; pydantic-core checks str literals with a single dict lookup
+FormationPattern = Literal["line", "circle", "grid", "v"]
+FormationAxis = Literal["x", "y"]
 
 
 class SpawnRequest(BaseModel):
@@ -11,7 +29,15 @@ class SpawnRequest(BaseModel):
     num: int = Field(default=5, ge=1, le=50, description="Number of drones to spawn")
 
 
-class TakeoffRequest(BaseModel):
+class _IdsRequest(BaseModel):
+    """Base for commands that target a set of drones."""
+    ids: DroneIds = Field(
+        default=["all"],
+        description="List of drone IDs or ['all'] for all drones"
+    )
+
+
+class TakeoffRequest(_IdsRequest):
     """Request to takeoff drones to specified altitude."""
     model_config = ConfigDict(json_schema_extra={
         "examples": [
@@ -20,54 +46,15 @@ class TakeoffRequest(BaseModel):
         ]
     })
 
-    ids: Union[List[int], List[Literal["all"]]] = Field(
-        default=["all"],
-        description="List of drone IDs or ['all'] for all drones"
-    )
-    altitude: float = Field(default=1.0, ge=0.1, le=5.0, description="Target altitude in meters")
-
-    @field_validator('ids')
-    @classmethod
-    def validate_ids(cls, v):
-        if isinstance(v, list) and len(v) == 1 and v[0] == "all":
-            return v
-        if isinstance(v, list) and all(isinstance(i, int) for i in v):
-            return v
-        raise ValueError("ids must be ['all'] or a list of integers")
+    altitude: Altitude = Field(default=1.0, description="Target altitude in meters")
 
 
-class LandRequest(BaseModel):
+class LandRequest(_IdsRequest):
     """Request to land drones."""
-    ids: Union[List[int], List[Literal["all"]]] = Field(
-        default=["all"],
-        description="List of drone IDs or ['all'] for all drones"
-    )
-
-    @field_validator('ids')
-    @classmethod
-    def validate_ids(cls, v):
-        if isinstance(v, list) and len(v) == 1 and v[0] == "all":
-            return v
-        if isinstance(v, list) and all(isinstance(i, int) for i in v):
-            return v
-        raise ValueError("ids must be ['all'] or a list of integers")
 
 
-class HoverRequest(BaseModel):
+class HoverRequest(_IdsRequest):
     """Request to hover drones at current position."""
-    ids: Union[List[int], List[Literal["all"]]] = Field(
-        default=["all"],
-        description="List of drone IDs or ['all'] for all drones"
-    )
-
-    @field_validator('ids')
-    @classmethod
-    def validate_ids(cls, v):
-        if isinstance(v, list) and len(v) == 1 and v[0] == "all":
-            return v
-        if isinstance(v, list) and all(isinstance(i, int) for i in v):
-            return v
-        raise ValueError("ids must be ['all'] or a list of integers")
 
 
 class GotoRequest(BaseModel):
@@ -80,40 +67,61 @@ class GotoRequest(BaseModel):
     })
 
     id: int = Field(ge=0, description="Drone ID")
-    x: float = Field(description="Target X position in meters")
-    y: float = Field(description="Target Y position in meters")
-    z: float = Field(ge=0.1, le=5.0, description="Target Z position (altitude) in meters")
+    x: Coordinate = Field(description="Target X position in meters (±10.0)")
+    y: Coordinate = Field(description="Target Y position in meters (±10.0)")
+    z: Altitude = Field(description="Target Z position (altitude) in meters")
     yaw: float = Field(default=0.0, description="Target yaw angle in radians")
 
-    @field_validator('x', 'y')
-    @classmethod
-    def validate_xy(cls, v):
-        if abs(v) > 10.0:
-            raise ValueError("x and y must be within ±10.0 meters")
-        return v
-
 
 class VelocityRequest(BaseModel):
     """Request to set drone velocity."""
     id: int = Field(ge=0, description="Drone ID")
-    vx: float = Field(description="X velocity in m/s")
-    vy: float = Field(description="Y velocity in m/s")
-    vz: float = Field(description="Z velocity in m/s")
-    yaw_rate: float = Field(default=0.0, description="Yaw rate in rad/s")
-
-    @field_validator('vx', 'vy', 'vz')
-    @classmethod
-    def validate_velocity(cls, v):
-        if abs(v) > 5.0:
-            raise ValueError("Velocity components must be within ±5.0 m/s")
-        return v
-
-    @field_validator('yaw_rate')
-    @classmethod
-    def validate_yaw_rate(cls, v):
-        if abs(v) > 2 * 3.14159:
-            raise ValueError("Yaw rate must be within ±2π rad/s")
-        return v
+    vx: VelocityComponent = Field(description="X velocity in m/s (±5.0)")
+    vy: VelocityComponent = Field(description="Y velocity in m/s (±5.0)")
+    vz: VelocityComponent = Field(description="Z velocity in m/s (±5.0)")
+    yaw_rate: YawRate = Field(default=0.0, description="Yaw rate in rad/s (±2π)")
+
+
+class GotoBatchRequest(BaseModel):
+    """Request to move several drones to target positions in one call (columnar arrays)."""
+    model_config = ConfigDict(json_schema_extra={
+        "examples": [
+            {"ids": [0, 1], "x": [2.0, -1.5], "y": [1.0, 2.0], "z": [1.5, 2.0], "yaw": [0.0, 1.57]}
+        ]
+    })
+
+    ids: List[DroneId] = Field(min_length=1, description="Drone IDs")
+    x: List[Coordinate] = Field(description="Target X positions in meters")
+    y: List[Coordinate] = Field(description="Target Y positions in meters")
+    z: List[Altitude] = Field(description="Target Z positions (altitude) in meters")
+    yaw: List[float] = Field(default_factory=list, description="Target yaw angles in radians (optional)")
+
+    @model_validator(mode='after')
+    def validate_columns(self):
+        n = len(self.ids)
+        if len(self.x) != n or len(self.y) != n or len(self.z) != n:
+            raise ValueError("ids, x, y and z must have the same length")
+        if self.yaw and len(self.yaw) != n:
+            raise ValueError("yaw must be empty or match the length of ids")
+        return self
+
+
+class VelocityBatchRequest(BaseModel):
+    """Request to set the velocity of several drones in one call (columnar arrays)."""
+    ids: List[DroneId] = Field(min_length=1, description="Drone IDs")
+    vx: List[VelocityComponent] = Field(description="X velocities in m/s")
+    vy: List[VelocityComponent] = Field(description="Y velocities in m/s")
+    vz: List[VelocityComponent] = Field(description="Z velocities in m/s")
+    yaw_rate: List[YawRate] = Field(default_factory=list, description="Yaw rates in rad/s (optional)")
+
+    @model_validator(mode='after')
+    def validate_columns(self):
+        n = len(self.ids)
+        if len(self.vx) != n or len(self.vy) != n or len(self.vz) != n:
+            raise ValueError("ids, vx, vy and vz must have the same length")
+        if self.yaw_rate and len(self.yaw_rate) != n:
+            raise ValueError("yaw_rate must be empty or match the length of ids")
+        return self
 
 
 class FormationRequest(BaseModel):
@@ -127,27 +135,16 @@ class FormationRequest(BaseModel):
         ]
     })
 
-    pattern: Literal["line", "circle", "grid", "v"] = Field(
+    pattern: FormationPattern = Field(
         description="Formation pattern: line, circle, grid, or v"
     )
-    center: List[float] = Field(
-        default=[0.0, 0.0, 1.0],
-        min_length=3,
-        max_length=3,
-        description="Formation center [x, y, z]"
+    center: Tuple[Coordinate, Coordinate, Altitude] = Field(
+        default=(0.0, 0.0, 1.0),
+        description="Formation center [x, y, z]; x, y within ±10.0, z between 0.1 and 5.0"
     )
     spacing: float = Field(default=1.0, ge=0.5, le=3.0, description="Spacing between drones in meters")
     radius: float = Field(default=1.5, ge=0.5, le=5.0, description="Radius for circular formation")
-    axis: Literal["x", "y"] = Field(default="x", description="Axis for line formation")
-
-    @field_validator('center')
-    @classmethod
-    def validate_center(cls, v):
-        if abs(v[0]) > 10.0 or abs(v[1]) > 10.0:
-            raise ValueError("Center x,y must be within ±10.0 meters")
-        if v[2] < 0.1 or v[2] > 5.0:
-            raise ValueError("Center z must be between 0.1 and 5.0 meters")
-        return v
+    axis: FormationAxis = Field(default="x", description="Axis for line formation")
 
 
 class DroneState(BaseModel):
@@ -173,6 +170,11 @@ class CommandResponse(BaseModel):
     affected_drones: List[int] = Field(default_factory=list)
 
 
+class FormationResponse(CommandResponse):
+    """Response for a formation command, optionally carrying the swarm state."""
+    state: Optional[StateResponse] = Field(default=None, description="Swarm state, when requested with return_state")
+
+
 class ResetResponse(BaseModel):
     """Response for reset command."""
     success: bool
@@ -192,3 +194,13 @@ class HivemindMoveRequest(BaseModel):
     position: List[float] = Field(default=[0.0, 0.0, 1.0], min_length=3, max_length=3, description="Target center of the swarm")
     yaw: float = Field(default=0.0, description="Target yaw of the swarm")
     scale: float = Field(default=1.0, ge=0.1, le=5.0, description="Target scale of the swarm")
+
+
+# Validators built once at import for payloads that bypass FastAPI's body binding (WebSocket commands)
+SPAWN_ADAPTER = TypeAdapter(SpawnRequest)
+TAKEOFF_ADAPTER = TypeAdapter(TakeoffRequest)
+LAND_ADAPTER = TypeAdapter(LandRequest)
+HOVER_ADAPTER = TypeAdapter(HoverRequest)
+GOTO_ADAPTER = TypeAdapter(GotoRequest)
+VELOCITY_ADAPTER = TypeAdapter(VelocityRequest)
+FORMATION_ADAPTER = TypeAdapter(FormationRequest)
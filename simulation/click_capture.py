@@ -4,8 +4,7 @@ Simple click capture tool that uses terminal input to mark positions.
 Press SPACE while hovering to capture the camera's target position.
 """
 
-import requests
-import time
+import httpx
 import sys
 import select
 import termios
@@ -17,6 +16,8 @@ class ClickCapture:
     def __init__(self):
         # Get terminal settings
         self.old_settings = termios.tcgetattr(sys.stdin)
+        # Persistent keep-alive connection for /state polling
+        self.client = httpx.Client(base_url=API_BASE, timeout=1.0)
 
     def __enter__(self):
         tty.setcbreak(sys.stdin.fileno())
@@ -24,9 +25,10 @@ class ClickCapture:
 
     def __exit__(self, *args):
         termios.tcsetattr(sys.stdin, termios.TCSADRAIN, self.old_settings)
+        self.client.close()
 
-    def get_key(self, timeout=0.05):
-        """Non-blocking key read with timeout"""
+    def get_key(self, timeout=None):
+        """Key read; blocks until a key arrives unless a timeout is given"""
         if select.select([sys.stdin], [], [], timeout)[0]:
             return sys.stdin.read(1)
         return None
@@ -34,8 +36,8 @@ class ClickCapture:
     def get_state(self):
         """Get current simulation state"""
         try:
-            response = requests.get(f"{API_BASE}/state", timeout=1.0)
-            if response.ok:
+            response = self.client.get("/state")
+            if response.is_success:
                 return response.json()
         except:
             pass
@@ -103,17 +105,16 @@ class ClickCapture:
                     print("\n\nExiting...\n")
                     break
 
-                time.sleep(0.05)
-
         except KeyboardInterrupt:
             print("\n\nInterrupted. Exiting...\n")
 
 def main():
     """Entry point"""
+    controller = ClickCapture()
     try:
         # Check if API is running
-        response = requests.get(f"{API_BASE}/state", timeout=2.0)
-        if not response.ok:
+        response = controller.client.get("/state", timeout=2.0)
+        if not response.is_success:
             print("❌ Error: Simulation API not responding")
             print(f"   Make sure simulation is running on {API_BASE}")
             sys.exit(1)
@@ -123,7 +124,7 @@ def main():
         print(f"   Error: {e}")
         sys.exit(1)
 
-    with ClickCapture() as controller:
+    with controller:
         controller.run()
 
 if __name__ == "__main__":
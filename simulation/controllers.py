@@ -2,156 +2,212 @@
 Simple PID controllers and formation planners for UAV swarm control.
 """
 
+import math
 import numpy as np
+from functools import lru_cache
 from typing import List, Tuple, Dict
 
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - optional speedup
+    njit = None
+
+
+def _pid_update_loop(ids, error, dt, kp, ki, kd, limits, integral, prev_error, output):
+    """Scalar PID loop over (drone, axis); updates integral/prev_error rows of ids in place."""
+    for k in range(ids.shape[0]):
+        i = ids[k]
+        for j in range(error.shape[1]):
+            e = error[k, j]
+            integ = integral[i, j] + e * dt
+            derivative = (e - prev_error[i, j]) / dt if dt > 0 else 0.0
+            raw = kp[j] * e + ki[j] * integ + kd[j] * derivative
+            out = min(max(raw, -limits[j]), limits[j])
+            # Anti-windup: back off the integral if the output saturated
+            if out != raw:
+                integ -= e * dt * 0.5
+            integral[i, j] = integ
+            prev_error[i, j] = e
+            output[k, j] = out
+
+
+def _pid_update_numpy(ids, error, dt, kp, ki, kd, limits, integral, prev_error, output):
+    """NumPy fallback with the same contract as the JIT kernel."""
+    integ = integral[ids] + error * dt
+    if dt > 0:
+        derivative = (error - prev_error[ids]) / dt
+    else:
+        derivative = 0.0
+
+    raw = kp * error + ki * integ + kd * derivative
+    np.clip(raw, -limits, limits, out=output)
+    integ -= np.where(output != raw, error * dt * 0.5, 0.0)
+
+    integral[ids] = integ
+    prev_error[ids] = error
+
+
+if njit is not None:
+    _pid_update = njit(cache=True, fastmath=True)(_pid_update_loop)
+    # Compile now (or load from the on-disk cache) instead of on the first control tick
+    _pid_update(np.zeros(1, dtype=np.intp), np.zeros((1, 4)), 0.01, np.ones(4), np.ones(4), np.ones(4),
+                np.ones(4), np.zeros((1, 4)), np.zeros((1, 4)), np.empty((1, 4)))
+else:
+    _pid_update = _pid_update_numpy
+
+
+class SwarmPositionController:
+    """
+    Position controller for a whole swarm.
 
-class PIDController:
-    """Simple PID controller with integral anti-windup and output clamping."""
+    PIDs on x, y, z and yaw with integral anti-windup and output clamping; the
+    state of every drone lives in (N, 4) arrays so all drones update in one pass.
+    """
 
-    def __init__(self, kp: float, ki: float, kd: float, output_limits: Tuple[float, float] = (-np.inf, np.inf)):
+    def __init__(self,
+                 num_drones: int,
+                 pos_gains: Tuple[float, float, float] = (2.0, 0.01, 0.5),
+                 yaw_gains: Tuple[float, float, float] = (2.0, 0.0, 0.3),
+                 max_velocity: float = 2.0,
+                 max_yaw_rate: float = np.pi):
         """
-        Initialize PID controller.
+        Initialize swarm position controller.
 
         Args:
-            kp: Proportional gain
-            ki: Integral gain
-            kd: Derivative gain
-            output_limits: (min, max) tuple for output clamping
+            num_drones: Number of drones
+            pos_gains: (kp, ki, kd) for position control
+            yaw_gains: (kp, ki, kd) for yaw control
+            max_velocity: Maximum velocity in m/s
+            max_yaw_rate: Maximum yaw rate in rad/s
         """
-        self.kp = kp
-        self.ki = ki
-        self.kd = kd
-        self.output_limits = output_limits
-
-        self.integral = 0.0
-        self.prev_error = 0.0
-        self.prev_time = None
-
-    def reset(self):
-        """Reset controller state."""
-        self.integral = 0.0
-        self.prev_error = 0.0
-        self.prev_time = None
-
-    def update(self, error: float, dt: float) -> float:
+        # Gains and output limits per column: x, y, z, yaw
+        self.kp, self.ki, self.kd = (np.array([g, g, g, y]) for g, y in zip(pos_gains, yaw_gains))
+        self.output_limits = np.array([max_velocity, max_velocity, max_velocity, max_yaw_rate])
+
+        self.integral = np.zeros((num_drones, 4))
+        self.prev_error = np.zeros((num_drones, 4))
+
+    def reset(self, ids=None):
+        """Reset controller state for the given drone IDs (all drones if None)."""
+        if ids is None:
+            ids = slice(None)
+        self.integral[ids] = 0.0
+        self.prev_error[ids] = 0.0
+
+    def set_max_velocity(self, max_velocity: float):
+        """Update maximum velocity for the position axes."""
+        self.output_limits[:3] = max_velocity
+
+    def compute_control(self,
+                        ids: np.ndarray,
+                        current_pos: np.ndarray,
+                        target_pos: np.ndarray,
+                        current_yaw: np.ndarray,
+                        target_yaw: np.ndarray,
+                        dt: float) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Update PID controller with new error measurement.
+        Compute velocity commands for a subset of drones.
 
         Args:
-            error: Current error (setpoint - measurement)
+            ids: Drone IDs to update, shape (K,)
+            current_pos: Current positions, shape (K, 3)
+            target_pos: Target positions, shape (K, 3)
+            current_yaw: Current yaw angles in radians, shape (K,)
+            target_yaw: Target yaw angles in radians, shape (K,)
             dt: Time step in seconds
 
         Returns:
-            Control output
+            (velocity_xyz of shape (K, 3), yaw_rate of shape (K,)) tuple
         """
-        # Proportional term
-        p_term = self.kp * error
-
-        # Integral term with anti-windup
-        self.integral += error * dt
-        i_term = self.ki * self.integral
+        error = np.empty((len(ids), 4))
+        np.subtract(target_pos, current_pos, out=error[:, :3])
+        # Yaw error (normalize to [-pi, pi])
+        yaw_error = target_yaw - current_yaw
+        error[:, 3] = np.arctan2(np.sin(yaw_error), np.cos(yaw_error))
 
-        # Derivative term
-        if dt > 0:
-            derivative = (error - self.prev_error) / dt
-        else:
-            derivative = 0.0
-        d_term = self.kd * derivative
+        output = np.empty_like(error)
+        _pid_update(ids, error, dt, self.kp, self.ki, self.kd, self.output_limits,
+                    self.integral, self.prev_error, output)
 
-        # Calculate output
-        output = p_term + i_term + d_term
+        return output[:, :3], output[:, 3]
 
-        # Clamp output
-        output = np.clip(output, self.output_limits[0], self.output_limits[1])
 
-        # Anti-windup: back-calculate integral if we're saturated
-        if output != p_term + i_term + d_term:
-            # We hit limits, reduce integral
-            self.integral -= error * dt * 0.5
+@lru_cache(maxsize=64)
+def _line_offsets(num_drones: int, spacing: float, axis: str) -> np.ndarray:
+    """(N, 3) line offsets from the formation center."""
+    if axis == 'x':
+        column = 0
+    elif axis == 'y':
+        column = 1
+    else:
+        raise ValueError(f"Invalid axis: {axis}. Use 'x' or 'y'.")
 
-        self.prev_error = error
+    offsets = np.zeros((num_drones, 3))
+    offsets[:, column] = (np.arange(num_drones) - (num_drones - 1) / 2.0) * spacing
+    return _read_only(offsets)
 
-        return output
 
+@lru_cache(maxsize=64)
+def _unit_circle(num_drones: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(cos, sin) of N evenly spaced angles."""
+    angles = 2 * np.pi * np.arange(num_drones) / num_drones
+    return np.cos(angles), np.sin(angles)
 
-class PositionController:
-    """3D position controller using separate PID controllers for x, y, z, and yaw."""
 
-    def __init__(self,
-                 pos_gains: Tuple[float, float, float] = (2.0, 0.01, 0.5),
-                 yaw_gains: Tuple[float, float, float] = (2.0, 0.0, 0.3),
-                 max_velocity: float = 2.0,
-                 max_yaw_rate: float = np.pi):
-        """
-        Initialize position controller.
+@lru_cache(maxsize=64)
+def _circle_offsets(num_drones: int, radius: float) -> np.ndarray:
+    """(N, 3) circle offsets from the formation center."""
+    cos, sin = _unit_circle(num_drones)
+    offsets = np.zeros((num_drones, 3))
+    offsets[:, 0] = radius * cos
+    offsets[:, 1] = radius * sin
+    return _read_only(offsets)
 
-        Args:
-            pos_gains: (kp, ki, kd) for position control
-            yaw_gains: (kp, ki, kd) for yaw control
-            max_velocity: Maximum velocity in m/s
-            max_yaw_rate: Maximum yaw rate in rad/s
-        """
-        self.pid_x = PIDController(*pos_gains, output_limits=(-max_velocity, max_velocity))
-        self.pid_y = PIDController(*pos_gains, output_limits=(-max_velocity, max_velocity))
-        self.pid_z = PIDController(*pos_gains, output_limits=(-max_velocity, max_velocity))
-        self.pid_yaw = PIDController(*yaw_gains, output_limits=(-max_yaw_rate, max_yaw_rate))
-
-    def reset(self):
-        """Reset all PID controllers."""
-        self.pid_x.reset()
-        self.pid_y.reset()
-        self.pid_z.reset()
-        self.pid_yaw.reset()
 
-    def set_max_velocity(self, max_velocity: float):
-        """Update maximum velocity for all position PIDs."""
-        self.pid_x.output_limits = (-max_velocity, max_velocity)
-        self.pid_y.output_limits = (-max_velocity, max_velocity)
-        self.pid_z.output_limits = (-max_velocity, max_velocity)
+@lru_cache(maxsize=64)
+def _grid_offsets(num_drones: int, spacing: float) -> np.ndarray:
+    """(N, 3) grid offsets from the formation center, filled row by row."""
+    # Calculate grid dimensions (try to make it square)
+    cols = int(np.ceil(np.sqrt(num_drones)))
+    rows = int(np.ceil(num_drones / cols))
 
-    def compute_control(self,
-                       current_pos: np.ndarray,
-                       target_pos: np.ndarray,
-                       current_yaw: float,
-                       target_yaw: float,
-                       dt: float) -> Tuple[np.ndarray, float]:
-        """
-        Compute velocity commands to reach target position and yaw.
+    row, col = np.divmod(np.arange(num_drones), cols)
+    offsets = np.zeros((num_drones, 3))
+    # Center the grid
+    offsets[:, 0] = (col - (cols - 1) / 2.0) * spacing
+    offsets[:, 1] = (row - (rows - 1) / 2.0) * spacing
+    return _read_only(offsets)
 
-        Args:
-            current_pos: Current [x, y, z] position
-            target_pos: Target [x, y, z] position
-            current_yaw: Current yaw angle in radians
-            target_yaw: Target yaw angle in radians
-            dt: Time step in seconds
 
-        Returns:
-            (velocity_xyz, yaw_rate) tuple
-        """
-        # Position errors
-        error_x = target_pos[0] - current_pos[0]
-        error_y = target_pos[1] - current_pos[1]
-        error_z = target_pos[2] - current_pos[2]
+@lru_cache(maxsize=64)
+def _v_offsets(num_drones: int, spacing: float, angle: float) -> np.ndarray:
+    """(N, 3) V offsets from the formation center; the leader sits at the center."""
+    i = np.arange(num_drones)
+    side = np.where(i % 2 == 0, 1.0, -1.0)
+    offset_back = (i + 1) // 2  # 0 for the leader
 
-        # Yaw error (normalize to [-pi, pi])
-        error_yaw = target_yaw - current_yaw
-        error_yaw = np.arctan2(np.sin(error_yaw), np.cos(error_yaw))
+    offsets = np.zeros((num_drones, 3))
+    offsets[:, 0] = -offset_back * (spacing * math.cos(angle))
+    offsets[:, 1] = side * offset_back * (spacing * math.sin(angle))
+    return _read_only(offsets)
 
-        # Compute control outputs
-        vx = self.pid_x.update(error_x, dt)
-        vy = self.pid_y.update(error_y, dt)
-        vz = self.pid_z.update(error_z, dt)
-        yaw_rate = self.pid_yaw.update(error_yaw, dt)
 
-        return np.array([vx, vy, vz]), yaw_rate
+def _read_only(array: np.ndarray) -> np.ndarray:
+    """Mark a cached array read-only so callers cannot corrupt the cache."""
+    array.setflags(write=False)
+    return array
 
 
 class FormationPlanner:
-    """Plans target positions for different swarm formations."""
+    """
+    Plans target positions for different swarm formations.
+
+    Offsets from the center depend only on the formation parameters, so they
+    are cached; each call just adds the center.
+    """
 
     @staticmethod
-    def line(center: np.ndarray, num_drones: int, spacing: float = 1.0, axis: str = 'x') -> List[np.ndarray]:
+    def line(center: np.ndarray, num_drones: int, spacing: float = 1.0, axis: str = 'x') -> np.ndarray:
         """
         Generate line formation.
 
@@ -162,28 +218,12 @@ class FormationPlanner:
             axis: 'x' or 'y' axis for line direction
 
         Returns:
-            List of target positions
+            (N, 3) array of target positions
         """
-        positions = []
-        start_offset = -(num_drones - 1) * spacing / 2.0
-
-        for i in range(num_drones):
-            pos = center.copy()
-            offset = start_offset + i * spacing
-
-            if axis == 'x':
-                pos[0] += offset
-            elif axis == 'y':
-                pos[1] += offset
-            else:
-                raise ValueError(f"Invalid axis: {axis}. Use 'x' or 'y'.")
-
-            positions.append(pos)
-
-        return positions
+        return np.asarray(center, dtype=float) + _line_offsets(num_drones, spacing, axis)
 
     @staticmethod
-    def circle(center: np.ndarray, num_drones: int, radius: float = 1.5) -> List[np.ndarray]:
+    def circle(center: np.ndarray, num_drones: int, radius: float = 1.5) -> np.ndarray:
         """
         Generate circular formation.
 
@@ -193,21 +233,12 @@ class FormationPlanner:
             radius: Circle radius
 
         Returns:
-            List of target positions
+            (N, 3) array of target positions
         """
-        positions = []
-
-        for i in range(num_drones):
-            angle = 2 * np.pi * i / num_drones
-            pos = center.copy()
-            pos[0] += radius * np.cos(angle)
-            pos[1] += radius * np.sin(angle)
-            positions.append(pos)
-
-        return positions
+        return np.asarray(center, dtype=float) + _circle_offsets(num_drones, radius)
 
     @staticmethod
-    def grid(center: np.ndarray, num_drones: int, spacing: float = 1.0) -> List[np.ndarray]:
+    def grid(center: np.ndarray, num_drones: int, spacing: float = 1.0) -> np.ndarray:
         """
         Generate grid formation (as square as possible).
 
@@ -217,31 +248,12 @@ class FormationPlanner:
             spacing: Distance between drones in grid
 
         Returns:
-            List of target positions
+            (N, 3) array of target positions
         """
-        positions = []
-
-        # Calculate grid dimensions (try to make it square)
-        cols = int(np.ceil(np.sqrt(num_drones)))
-        rows = int(np.ceil(num_drones / cols))
-
-        # Center the grid
-        start_x = -(cols - 1) * spacing / 2.0
-        start_y = -(rows - 1) * spacing / 2.0
-
-        for i in range(num_drones):
-            row = i // cols
-            col = i % cols
-
-            pos = center.copy()
-            pos[0] += start_x + col * spacing
-            pos[1] += start_y + row * spacing
-            positions.append(pos)
-
-        return positions
+        return np.asarray(center, dtype=float) + _grid_offsets(num_drones, spacing)
 
     @staticmethod
-    def v_formation(center: np.ndarray, num_drones: int, spacing: float = 1.0, angle: float = np.pi/6) -> List[np.ndarray]:
+    def v_formation(center: np.ndarray, num_drones: int, spacing: float = 1.0, angle: float = np.pi/6) -> np.ndarray:
         """
         Generate V formation (like flying geese).
 
@@ -252,24 +264,9 @@ class FormationPlanner:
             angle: V-angle from center line (radians)
 
         Returns:
-            List of target positions
+            (N, 3) array of target positions, leader first
         """
-        positions = []
-
-        # Leader at front
-        positions.append(center.copy())
-
-        # Followers in V behind leader
-        for i in range(1, num_drones):
-            pos = center.copy()
-            side = 1 if i % 2 == 0 else -1
-            offset_back = (i + 1) // 2
-
-            pos[0] -= offset_back * spacing * np.cos(angle)
-            pos[1] += side * offset_back * spacing * np.sin(angle)
-            positions.append(pos)
-
-        return positions
+        return np.asarray(center, dtype=float) + _v_offsets(num_drones, spacing, angle)
 
 
 def clamp_position(pos: np.ndarray,
@@ -279,18 +276,16 @@ def clamp_position(pos: np.ndarray,
     Clamp position to safe boundaries.
 
     Args:
-        pos: Position [x, y, z]
+        pos: Position [x, y, z], or an (N, 3) array of positions
         bounds_xy: (min, max) for x and y
         bounds_z: (min, max) for z
 
     Returns:
-        Clamped position
+        Clamped position(s) as a new array
     """
-    clamped = pos.copy()
-    clamped[0] = np.clip(clamped[0], bounds_xy[0], bounds_xy[1])
-    clamped[1] = np.clip(clamped[1], bounds_xy[0], bounds_xy[1])
-    clamped[2] = np.clip(clamped[2], bounds_z[0], bounds_z[1])
-    return clamped
+    lower = (bounds_xy[0], bounds_xy[0], bounds_z[0])
+    upper = (bounds_xy[1], bounds_xy[1], bounds_z[1])
+    return np.clip(pos, lower, upper)
 
 
 def clamp_velocity(vel: np.ndarray, max_vel: float = 2.0) -> np.ndarray:
@@ -304,7 +299,10 @@ def clamp_velocity(vel: np.ndarray, max_vel: float = 2.0) -> np.ndarray:
     Returns:
         Clamped velocity
     """
-    magnitude = np.linalg.norm(vel)
-    if magnitude > max_vel:
-        return vel * (max_vel / magnitude)
-    return vel
+    # Plain float math: for three components np.linalg.norm is mostly dispatch overhead
+    vx, vy, vz = float(vel[0]), float(vel[1]), float(vel[2])
+    magnitude_sq = vx * vx + vy * vy + vz * vz
+    if magnitude_sq <= max_vel * max_vel:
+        return vel
+    scale = max_vel / math.sqrt(magnitude_sq)
+    return np.array([vx * scale, vy * scale, vz * scale])
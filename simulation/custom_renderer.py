@@ -4,12 +4,88 @@ Provides stable, flicker-free visualization using GPU-accelerated camera renderi
 """
 
 import cv2
+import math
 import numpy as np
 import pybullet as p
-from typing import Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 import threading
 import time
 
+# Dynamic resolution: lowest internal render scale and the step used to move toward it
+_MIN_RENDER_SCALE = 0.5
+_RENDER_SCALE_STEP = 0.25
+
+# Non-blocking key poll (OpenCV >= 4.5); waitKey(1) sleeps at least 1 ms per frame
+_poll_key = cv2.pollKey if hasattr(cv2, "pollKey") else (lambda: cv2.waitKey(1))
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - optional speedup
+    njit = None
+
+
+def _ground_ray_hit_loop(inv_vp, inv_view, norm_x, norm_y):
+    """Cast a ray through normalized screen coords onto z=0; returns (x, y, hit)."""
+    # Unproject onto the near plane: inv(P V) @ (norm_x, norm_y, -1, 1)
+    hx = inv_vp[0, 0] * norm_x + inv_vp[0, 1] * norm_y - inv_vp[0, 2] + inv_vp[0, 3]
+    hy = inv_vp[1, 0] * norm_x + inv_vp[1, 1] * norm_y - inv_vp[1, 2] + inv_vp[1, 3]
+    hz = inv_vp[2, 0] * norm_x + inv_vp[2, 1] * norm_y - inv_vp[2, 2] + inv_vp[2, 3]
+    hw = inv_vp[3, 0] * norm_x + inv_vp[3, 1] * norm_y - inv_vp[3, 2] + inv_vp[3, 3]
+
+    # Ray from the camera (translation column of the inverse view) through that point
+    cx = inv_view[0, 3]
+    cy = inv_view[1, 3]
+    cz = inv_view[2, 3]
+    dx = hx / hw - cx
+    dy = hy / hw - cy
+    dz = hz / hw - cz
+    norm = math.sqrt(dx * dx + dy * dy + dz * dz)
+    dx /= norm
+    dy /= norm
+    dz /= norm
+
+    # Solve camera_pos + t * dir for z = 0
+    if abs(dz) < 1e-6:
+        return 0.0, 0.0, False
+    t = -cz / dz
+    if t < 0:
+        return 0.0, 0.0, False
+    return cx + t * dx, cy + t * dy, True
+
+
+def _ground_ray_hit_numpy(inv_vp, inv_view, norm_x, norm_y):
+    """NumPy fallback with the same contract as the JIT kernel."""
+    # Unproject onto the near plane
+    near = inv_vp @ np.array([norm_x, norm_y, -1.0, 1.0], dtype=np.float32)
+
+    # Camera position (inverse view applied to the eye-space origin)
+    camera_pos = inv_view[:3, 3]
+    rx, ry, rz = (near[:3] / near[3] - camera_pos).tolist()
+    # Scalar normalize; np.linalg.norm costs more in dispatch than the math for 3 elements
+    inv_norm = 1.0 / math.sqrt(rx * rx + ry * ry + rz * rz)
+    ray_direction = np.array((rx * inv_norm, ry * inv_norm, rz * inv_norm))
+
+    # Ray cast to ground plane (z=0)
+    # ray_point = camera_pos + t * ray_direction
+    # Solve for t where z = 0
+    if abs(ray_direction[2]) < 1e-6:
+        return 0.0, 0.0, False
+
+    t = -camera_pos[2] / ray_direction[2]
+    if t < 0:
+        return 0.0, 0.0, False
+
+    intersection = camera_pos + t * ray_direction
+    return float(intersection[0]), float(intersection[1]), True
+
+
+if njit is not None:
+    _ground_ray_hit = njit(cache=True, fastmath=True)(_ground_ray_hit_loop)
+    # Compile now (or load from the on-disk cache) instead of on the first right-click
+    _ground_ray_hit(np.eye(4, dtype=np.float32), np.eye(4, dtype=np.float32), 0.0, 0.0)
+else:
+    _ground_ray_hit = _ground_ray_hit_numpy
+
 
 class CustomRenderer:
     """
@@ -28,7 +104,8 @@ class CustomRenderer:
                  camera_yaw: float = 50,
                  camera_pitch: float = -35,
                  camera_target: Tuple[float, float, float] = (0, 0, 0),
-                 render_fps: int = 60):
+                 render_fps: int = 60,
+                 physics_lock: Optional[threading.Lock] = None):
         """
         Initialize custom renderer.
 
@@ -41,29 +118,27 @@ class CustomRenderer:
             camera_pitch: Camera pitch angle (degrees)
             camera_target: Camera look-at point (x, y, z)
             render_fps: Target rendering FPS
+            physics_lock: Lock held while stepping the physics client; getCameraImage
+                runs under it because pybullet is not thread-safe
         """
         self.client_id = physics_client_id
         self.width = window_width
         self.height = window_height
         self.render_fps = render_fps
         self.frame_time = 1.0 / render_fps
+        self.physics_lock = physics_lock or threading.Lock()
 
         # Camera parameters
         self.camera_distance = camera_distance
         self.camera_yaw = camera_yaw
         self.camera_pitch = camera_pitch
-        self.camera_target = list(camera_target)
+        self.camera_target = np.array(camera_target, dtype=np.float64)
 
-        # OpenCV window
+        # OpenCV window; every HighGUI call must come from the thread that creates it,
+        # which has to be the main thread (Cocoa on macOS rejects windows elsewhere)
         self.window_name = "AUS-Lab Drone Swarm Simulation"
-        print(f"[CustomRenderer] Creating OpenCV window...")
-        try:
-            cv2.namedWindow(self.window_name, cv2.WINDOW_NORMAL)
-            cv2.resizeWindow(self.window_name, window_width, window_height)
-            print(f"[CustomRenderer] OpenCV window created successfully")
-        except Exception as e:
-            print(f"[CustomRenderer] ERROR creating OpenCV window: {e}")
-            raise
+        self.opengl_window = False
+        self._create_window()
 
         # Mouse interaction state
         self.mouse_pressed = False
@@ -71,34 +146,123 @@ class CustomRenderer:
         self.last_mouse_y = 0
         self.last_clicked_coords: Optional[Tuple[float, float, float]] = None
 
-        # Set up mouse callback
-        cv2.setMouseCallback(self.window_name, self._mouse_callback)
+        # HUD text blocks pre-rendered into small tiles, keyed by block name and
+        # re-rasterized only when the text they show changes
+        self._hud_layers: Dict[str, tuple] = {}
 
-        # Compute view and projection matrices
+        # Compute view and projection matrices; the projection depends only on the
+        # fixed aspect ratio and the view only on the camera parameters, so both are memoized
+        self.proj_matrix = None
+        self._camera_key: Optional[tuple] = None
         self._update_camera_matrices()
 
+        # Set by mouse handlers; matrices are recomputed once at the next render()
+        # instead of on every drag/wheel event
+        self._cam_dirty = False
+
+        # Reused BGR frame; cvtColor writes into it instead of allocating per frame
+        self._bgr_buf = np.empty((self.height, self.width, 3), dtype=np.uint8)
+
+        # Dynamic resolution: getCameraImage renders at width/height * _render_scale and
+        # the frame is upscaled into _display_buf; see _adjust_render_scale
+        self._render_scale = 1.0
+        self._slow_seconds = 0
+        self._frame_work = 0.0
+        self._display_buf = np.empty((self.height, self.width, 3), dtype=np.uint8)
+
+        # Frame skipping: the owner bumps scene_version whenever the scene visibly changes
+        # (SwarmWorld does when a drone pose moves); None means render every frame
+        self.scene_version: Optional[int] = None
+        self._last_frame_sig: Optional[tuple] = None
+        self._frames_rendered = 0
+
+        # Per-slot BGR frames for render_many()
+        self._view_bufs: List[np.ndarray] = []
+
         # Performance tracking
         self.last_render_time = time.time()
         self.frame_count = 0
         self.fps_counter = 0
         self.fps_last_time = time.time()
-        self.render_skip_counter = 99  # Start high so first call renders immediately
-        self.render_every_n_frames = max(1, int(240 / render_fps))  # Render every N physics steps
-
-        print(f"[CustomRenderer] Will render every {self.render_every_n_frames} frames (240Hz / {render_fps}fps)", flush=True)
 
         # Rendering state
         self.is_active = True
+        self._window_closed = False
 
         print(f"[CustomRenderer] Initialized {window_width}x{window_height} @ {render_fps}fps")
         print(f"[CustomRenderer] Camera: distance={camera_distance}, yaw={camera_yaw}, pitch={camera_pitch}")
         print(f"[CustomRenderer] Controls: Left-drag to rotate, Right-click for coordinates, Mouse wheel to zoom")
 
+    def _create_window(self):
+        """Create the OpenCV window and hook up the mouse callback."""
+        print(f"[CustomRenderer] Creating OpenCV window...")
+        try:
+            try:
+                # OpenGL-backed window: imshow uploads frames straight to a GL texture
+                cv2.namedWindow(self.window_name, cv2.WINDOW_NORMAL | cv2.WINDOW_OPENGL)
+                self.opengl_window = True
+            except cv2.error:
+                # OpenCV built without OpenGL support
+                cv2.namedWindow(self.window_name, cv2.WINDOW_NORMAL)
+                self.opengl_window = False
+            cv2.resizeWindow(self.window_name, self.width, self.height)
+            print(f"[CustomRenderer] OpenCV window created successfully (OpenGL: {self.opengl_window})")
+        except Exception as e:
+            print(f"[CustomRenderer] ERROR creating OpenCV window: {e}")
+            raise
+
+        # Set up mouse callback
+        cv2.setMouseCallback(self.window_name, self._mouse_callback)
+
+    def run(self, keep_running: Callable[[], bool] = lambda: True):
+        """
+        Render at render_fps until the window is closed or keep_running() turns False.
+
+        Call from the main thread while physics steps on a worker thread; the
+        physics lock keeps getCameraImage from overlapping a step.
+
+        Args:
+            keep_running: Polled once per frame; return False to stop rendering
+        """
+        next_frame = time.perf_counter()
+        while self.is_active and keep_running():
+            if not self.render():
+                break
+
+            next_frame += self.frame_time
+            delay = next_frame - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_frame = time.perf_counter()  # Fell behind; don't try to catch up
+
+        self.is_active = False
+        self._destroy_window()
+
+    def set_physics_client(self, physics_client_id: int):
+        """Point the renderer at a new physics client (e.g. after a respawn), keeping the window."""
+        self.client_id = physics_client_id
+        self._last_frame_sig = None
+
+    def _destroy_window(self):
+        """Destroy the OpenCV window once; must run on the thread that created it."""
+        if self._window_closed:
+            return
+        self._window_closed = True
+        cv2.destroyWindow(self.window_name)
+        cv2.destroyAllWindows()
+
     def _update_camera_matrices(self):
         """Update view and projection matrices based on camera parameters."""
+        target = self.camera_target.tolist()
+        camera_key = (self.camera_distance, self.camera_yaw, self.camera_pitch, *target)
+        if camera_key == self._camera_key:
+            return  # Camera didn't actually move (e.g. zoom already at its limit)
+        self._camera_key = camera_key
+
         # Compute view matrix
         self.view_matrix = p.computeViewMatrixFromYawPitchRoll(
-            cameraTargetPosition=self.camera_target,
+            cameraTargetPosition=target,
             distance=self.camera_distance,
             yaw=self.camera_yaw,
             pitch=self.camera_pitch,
@@ -107,15 +271,22 @@ class CustomRenderer:
             physicsClientId=self.client_id
         )
 
-        # Compute projection matrix
-        aspect = self.width / self.height
-        self.proj_matrix = p.computeProjectionMatrixFOV(
-            fov=60.0,
-            aspect=aspect,
-            nearVal=0.1,
-            farVal=100.0,
-            physicsClientId=self.client_id
-        )
+        # Compute projection matrix (once; the window aspect never changes)
+        if self.proj_matrix is None:
+            aspect = self.width / self.height
+            self.proj_matrix = p.computeProjectionMatrixFOV(
+                fov=60.0,
+                aspect=aspect,
+                nearVal=0.1,
+                farVal=100.0,
+                physicsClientId=self.client_id
+            )
+            self._inv_proj = np.linalg.inv(np.asarray(self.proj_matrix, dtype=np.float32).reshape(4, 4, order='F'))
+
+        # Inverses for ray casting in _screen_to_world, recomputed only when the camera changes;
+        # inv(P V) is composed once so a click is a single 4x4 product, no per-click inversion
+        self._inv_view = np.linalg.inv(np.asarray(self.view_matrix, dtype=np.float32).reshape(4, 4, order='F'))
+        self._inv_vp = self._inv_view @ self._inv_proj
 
     def _mouse_callback(self, event, x, y, flags, param):
         """Handle mouse events for camera control and coordinate picking."""
@@ -143,7 +314,7 @@ class CustomRenderer:
             self.last_mouse_x = x
             self.last_mouse_y = y
 
-            self._update_camera_matrices()
+            self._cam_dirty = True
 
         # Right click: get world coordinates
         elif event == cv2.EVENT_RBUTTONDOWN:
@@ -159,7 +330,7 @@ class CustomRenderer:
             else:  # Scroll down
                 self.camera_distance = min(20.0, self.camera_distance + 0.5)
 
-            self._update_camera_matrices()
+            self._cam_dirty = True
 
     def _screen_to_world(self, screen_x: int, screen_y: int) -> Optional[Tuple[float, float, float]]:
         """
@@ -172,71 +343,64 @@ class CustomRenderer:
         Returns:
             World (x, y, z) coordinates or None if ray misses
         """
+        # A drag earlier in this same event batch may not have reached the matrices yet
+        if self._cam_dirty:
+            self._cam_dirty = False
+            self._update_camera_matrices()
+
         # Normalize screen coordinates to [-1, 1]
         norm_x = (2.0 * screen_x / self.width) - 1.0
         norm_y = 1.0 - (2.0 * screen_y / self.height)
 
-        # Compute ray from camera through screen point
-        view_mat = np.array(self.view_matrix).reshape(4, 4, order='F')
-        proj_mat = np.array(self.proj_matrix).reshape(4, 4, order='F')
-
-        # Inverse projection
-        clip_coords = np.array([norm_x, norm_y, -1.0, 1.0])
-        eye_coords = np.linalg.inv(proj_mat) @ clip_coords
-        eye_coords = np.array([eye_coords[0], eye_coords[1], -1.0, 0.0])
-
-        # Inverse view
-        world_coords = np.linalg.inv(view_mat) @ eye_coords
-        ray_direction = world_coords[:3]
-        ray_direction = ray_direction / np.linalg.norm(ray_direction)
-
-        # Camera position
-        camera_pos = np.linalg.inv(view_mat) @ np.array([0, 0, 0, 1])
-        camera_pos = camera_pos[:3]
-
-        # Ray cast to ground plane (z=0)
-        # ray_point = camera_pos + t * ray_direction
-        # Solve for t where z = 0
-        if abs(ray_direction[2]) < 1e-6:
-            return None
-
-        t = -camera_pos[2] / ray_direction[2]
-        if t < 0:
+        x, y, hit = _ground_ray_hit(self._inv_vp, self._inv_view, norm_x, norm_y)
+        if not hit:
             return None
-
-        intersection = camera_pos + t * ray_direction
-        return (float(intersection[0]), float(intersection[1]), 0.0)
+        return (float(x), float(y), 0.0)
 
     def render(self) -> bool:
         """
         Render one frame to OpenCV window.
 
-        Uses frame skipping to maintain target FPS without blocking.
-        Call this every physics step - it will automatically skip frames as needed.
+        Called from the main thread; paced by run(), not by physics steps.
 
         Returns:
             True if window is still open, False if closed
         """
         # ALWAYS process input to keep window responsive
         try:
-            key = cv2.waitKey(1) & 0xFF
+            key = _poll_key() & 0xFF
             if key == 27 or key == ord('q'):
                 return False
         except Exception as e:
-            print(f"[CustomRenderer] ERROR in waitKey: {e}", flush=True)
+            print(f"[CustomRenderer] ERROR in pollKey: {e}", flush=True)
             return False
 
-        # Frame skipping for performance - render every Nth frame
-        self.render_skip_counter += 1
-        should_render = (self.render_skip_counter >= self.render_every_n_frames)
+        # R to reset camera
+        if key == ord('r'):
+            self.camera_distance = 8.0
+            self.camera_yaw = 50
+            self.camera_pitch = -35
+            self.camera_target = np.zeros(3)
+            self._cam_dirty = True
+            print("[CustomRenderer] Camera reset to default position")
 
-        if not should_render:
-            # Skip actual rendering but input was already processed
-            return True
+        # Apply camera moves from this frame's mouse events in one recomputation
+        if self._cam_dirty:
+            self._cam_dirty = False
+            self._update_camera_matrices()
 
-        # Reset counter and proceed with rendering
-        self.render_skip_counter = 0
         current_time = time.time()
+        frame_start = time.perf_counter()
+
+        # Skip the capture and window upload when nothing on screen would change:
+        # same camera, no drone moved since the last frame, same click marker.
+        # The FPS readout alone doesn't force a frame; it catches up on the next one
+        frame_sig = (self._camera_key, self.scene_version,
+                     self.last_clicked_coords, self._render_scale)
+        if self.scene_version is not None and frame_sig == self._last_frame_sig:
+            self._count_frame(current_time, rendered=False)
+            self.last_render_time = current_time
+            return self._window_open()
 
         if self.frame_count == 0:
             print(f"[CustomRenderer] Starting first render...", flush=True)
@@ -246,14 +410,19 @@ class CustomRenderer:
             if self.frame_count == 0:
                 print(f"[CustomRenderer] Attempting first getCameraImage call...", flush=True)
 
-            width, height, rgb_img, depth_img, seg_img = p.getCameraImage(
-                width=self.width,
-                height=self.height,
-                viewMatrix=self.view_matrix,
-                projectionMatrix=self.proj_matrix,
-                renderer=p.ER_BULLET_HARDWARE_OPENGL,
-                physicsClientId=self.client_id
-            )
+            # Only the RGBA buffer is used; skip building the segmentation mask and keep
+            # the shadow pass off (the depth buffer is always returned and is ignored)
+            with self.physics_lock:
+                width, height, rgb_img, _, _ = p.getCameraImage(
+                    width=int(self.width * self._render_scale),
+                    height=int(self.height * self._render_scale),
+                    viewMatrix=self.view_matrix,
+                    projectionMatrix=self.proj_matrix,
+                    renderer=p.ER_BULLET_HARDWARE_OPENGL,
+                    shadow=0,
+                    flags=p.ER_NO_SEGMENTATION_MASK,
+                    physicsClientId=self.client_id
+                )
 
             if self.frame_count == 0:
                 print(f"[CustomRenderer] SUCCESS! Got first image: {width}x{height}, rgb_img type: {type(rgb_img)}", flush=True)
@@ -264,16 +433,19 @@ class CustomRenderer:
             traceback.print_exc()
             return False
 
-        # Convert to OpenCV format (RGB to BGR)
-        rgb_array = np.array(rgb_img, dtype=np.uint8).reshape(height, width, 4)
-        bgr_array = cv2.cvtColor(rgb_array, cv2.COLOR_RGBA2BGR)
+        # Convert to OpenCV format (RGB to BGR); asarray is a view when pybullet returns an ndarray
+        rgb_array = np.asarray(rgb_img, dtype=np.uint8).reshape(height, width, 4)
+        if self._bgr_buf.shape[:2] != (height, width):
+            self._bgr_buf = np.empty((height, width, 3), dtype=np.uint8)
+        bgr_array = cv2.cvtColor(rgb_array, cv2.COLOR_RGBA2BGR, dst=self._bgr_buf)
+
+        # Upscale reduced-resolution renders to the window size (HUD is drawn at full size)
+        if (height, width) != (self.height, self.width):
+            bgr_array = cv2.resize(bgr_array, (self.width, self.height),
+                                   interpolation=cv2.INTER_LINEAR, dst=self._display_buf)
 
         # Add FPS overlay
-        self.frame_count += 1
-        if current_time - self.fps_last_time >= 1.0:
-            self.fps_counter = self.frame_count
-            self.frame_count = 0
-            self.fps_last_time = current_time
+        self._count_frame(current_time, rendered=True)
 
         # Draw HUD
         self._draw_hud(bgr_array)
@@ -283,6 +455,8 @@ class CustomRenderer:
             if self.frame_count == 0:
                 print(f"[CustomRenderer] Calling imshow for first time with image shape: {bgr_array.shape}", flush=True)
             cv2.imshow(self.window_name, bgr_array)
+            self._frame_work += time.perf_counter() - frame_start
+            self._last_frame_sig = frame_sig
             if self.frame_count == 0:
                 print(f"[CustomRenderer] First imshow successful!", flush=True)
         except Exception as e:
@@ -291,42 +465,108 @@ class CustomRenderer:
             traceback.print_exc()
             return False
 
-        # R to reset camera (key was already checked at start of function)
-        if key == ord('r'):
-            self.camera_distance = 8.0
-            self.camera_yaw = 50
-            self.camera_pitch = -35
-            self.camera_target = [0, 0, 0]
-            self._update_camera_matrices()
-            print("[CustomRenderer] Camera reset to default position")
+        self.last_render_time = current_time
+        return self._window_open()
 
-        # Check if window was closed
+    def _count_frame(self, current_time: float, rendered: bool):
+        """Count a frame toward the FPS readout; once a second, publish it and rescale."""
+        self.frame_count += 1
+        self._frames_rendered += rendered
+        if current_time - self.fps_last_time >= 1.0:
+            self.fps_counter = self.frame_count
+            # Average the work over captured frames only; skipped ones cost next to nothing
+            if self._frames_rendered:
+                self._adjust_render_scale(self._frame_work / self._frames_rendered)
+            self._frame_work = 0.0
+            self._frames_rendered = 0
+            self.frame_count = 0
+            self.fps_last_time = current_time
+
+    def _window_open(self) -> bool:
+        """Check whether the window is still open (False once the user closes it)."""
         try:
             if cv2.getWindowProperty(self.window_name, cv2.WND_PROP_VISIBLE) < 1:
                 return False
         except:
             return False
-
-        self.last_render_time = current_time
         return True
 
+    def render_many(self, view_matrices: List[Tuple[float, ...]]) -> List[np.ndarray]:
+        """
+        Capture several camera views (e.g. per-drone POVs) in one physics-lock acquisition.
+
+        All views share this renderer's projection matrix and resolution. Frames are
+        converted outside the lock into per-slot BGR buffers that are reused by the
+        next call, so copy any frame that must outlive it.
+
+        Args:
+            view_matrices: Flat 16-element view matrices, as from p.computeViewMatrix*
+
+        Returns:
+            One (height, width, 3) BGR frame per view matrix
+        """
+        with self.physics_lock:
+            images = [
+                p.getCameraImage(
+                    width=self.width,
+                    height=self.height,
+                    viewMatrix=view_matrix,
+                    projectionMatrix=self.proj_matrix,
+                    renderer=p.ER_BULLET_HARDWARE_OPENGL,
+                    shadow=0,
+                    flags=p.ER_NO_SEGMENTATION_MASK,
+                    physicsClientId=self.client_id
+                )
+                for view_matrix in view_matrices
+            ]
+
+        frames = []
+        for slot, (width, height, rgb_img, _, _) in enumerate(images):
+            if slot == len(self._view_bufs):
+                self._view_bufs.append(np.empty((height, width, 3), dtype=np.uint8))
+            elif self._view_bufs[slot].shape[:2] != (height, width):
+                self._view_bufs[slot] = np.empty((height, width, 3), dtype=np.uint8)
+            rgb_array = np.asarray(rgb_img, dtype=np.uint8).reshape(height, width, 4)
+            frames.append(cv2.cvtColor(rgb_array, cv2.COLOR_RGBA2BGR, dst=self._view_bufs[slot]))
+        return frames
+
+    def _adjust_render_scale(self, avg_frame_work: float):
+        """
+        Lower the internal render resolution after sustained low FPS; raise it again
+        once the measured per-frame work leaves room for the extra pixels.
+
+        Args:
+            avg_frame_work: Mean seconds spent rendering a frame over the last second
+        """
+        if self.fps_counter < self.render_fps * 0.9:
+            self._slow_seconds += 1
+            if self._slow_seconds >= 3 and self._render_scale > _MIN_RENDER_SCALE:
+                self._render_scale = max(_MIN_RENDER_SCALE, self._render_scale - _RENDER_SCALE_STEP)
+                self._slow_seconds = 0
+                print(f"[CustomRenderer] Render scale lowered to {self._render_scale:.2f}")
+            return
+
+        self._slow_seconds = 0
+        if self._render_scale < 1.0:
+            scale_up = min(1.0, self._render_scale + _RENDER_SCALE_STEP)
+            # Render cost grows with pixel count, i.e. with the square of the scale
+            if avg_frame_work * (scale_up / self._render_scale) ** 2 < 0.8 * self.frame_time:
+                self._render_scale = scale_up
+                print(f"[CustomRenderer] Render scale raised to {self._render_scale:.2f}")
+
     def _draw_hud(self, img: np.ndarray):
         """Draw heads-up display with info and controls."""
-        font = cv2.FONT_HERSHEY_SIMPLEX
         font_scale = 0.6
         thickness = 2
         color = (0, 255, 0)  # Green
-        bg_color = (0, 0, 0)  # Black
 
-        # FPS counter
+        # FPS counter (on a solid black box)
         fps_text = f"FPS: {self.fps_counter}"
-        text_size = cv2.getTextSize(fps_text, font, font_scale, thickness)[0]
-        cv2.rectangle(img, (10, 10), (20 + text_size[0], 40 + text_size[1]), bg_color, -1)
-        cv2.putText(img, fps_text, (15, 35), font, font_scale, color, thickness)
+        self._blit_hud_layer(img, "fps", [(fps_text, (15, 35))], font_scale, color, thickness, box=True)
 
         # Camera info
         cam_text = f"Cam: dist={self.camera_distance:.1f} yaw={self.camera_yaw:.0f} pitch={self.camera_pitch:.0f}"
-        cv2.putText(img, cam_text, (15, 70), font, font_scale * 0.8, color, thickness - 1)
+        self._blit_hud_layer(img, "cam", [(cam_text, (15, 70))], font_scale * 0.8, color, thickness - 1)
 
         # Controls
         controls = [
@@ -339,14 +579,75 @@ class CustomRenderer:
         ]
 
         y_offset = self.height - 180
-        for i, line in enumerate(controls):
-            cv2.putText(img, line, (15, y_offset + i * 25), font, 0.5, color, 1)
+        lines = [(line, (15, y_offset + i * 25)) for i, line in enumerate(controls)]
+        self._blit_hud_layer(img, "controls", lines, 0.5, color, 1)
 
         # Last clicked coordinates
         if self.last_clicked_coords is not None:
             x, y, z = self.last_clicked_coords
             coord_text = f"Last click: ({x:.2f}, {y:.2f}, {z:.2f})"
-            cv2.putText(img, coord_text, (15, self.height - 20), font, 0.6, (0, 255, 255), 2)
+            self._blit_hud_layer(img, "click", [(coord_text, (15, self.height - 20))], 0.6, (0, 255, 255), 2)
+
+    def _blit_hud_layer(self, img: np.ndarray, name: str, lines: List[Tuple[str, Tuple[int, int]]],
+                        font_scale: float, color: Tuple[int, int, int], thickness: int, box: bool = False):
+        """
+        Copy a cached HUD text block onto the frame, rasterizing it first if its text changed.
+
+        Args:
+            img: BGR frame to draw on
+            name: Cache key for the block
+            lines: (text, baseline origin) pairs in frame coordinates
+            font_scale: cv2.putText font scale
+            color: Text color (BGR)
+            thickness: Stroke thickness
+            box: Draw the block on an opaque black box instead of over the scene
+        """
+        layer = self._hud_layers.get(name)
+        if layer is None or layer[0] != lines:
+            layer = (lines,) + self._render_hud_tile(lines, font_scale, color, thickness, box)
+            self._hud_layers[name] = layer
+        _, x0, y0, tile, mask = layer
+
+        # Clip the tile to the frame
+        h, w = tile.shape[:2]
+        top, left = max(0, -y0), max(0, -x0)
+        bottom, right = min(h, img.shape[0] - y0), min(w, img.shape[1] - x0)
+        if top >= bottom or left >= right:
+            return
+
+        roi = img[y0 + top:y0 + bottom, x0 + left:x0 + right]
+        if mask is None:
+            roi[...] = tile[top:bottom, left:right]
+        else:
+            np.copyto(roi, tile[top:bottom, left:right], where=mask[top:bottom, left:right])
+
+    @staticmethod
+    def _render_hud_tile(lines: List[Tuple[str, Tuple[int, int]]], font_scale: float,
+                         color: Tuple[int, int, int], thickness: int, box: bool):
+        """Rasterize text lines into a tile; returns (x0, y0, tile, mask) with mask None if opaque."""
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        sizes = [cv2.getTextSize(text, font, font_scale, thickness) for text, _ in lines]
+
+        if box:
+            # Same geometry as the original FPS box: filled from (10, 10) to (20 + w, 40 + h)
+            (text_w, text_h), _ = sizes[0]
+            x0, y0, x1, y1 = 10, 10, 21 + text_w, 41 + text_h
+        else:
+            # Bounding box of all lines in frame coordinates, padded for the stroke width
+            pad = thickness + 1
+            x0 = min(org[0] for _, org in lines) - pad
+            y0 = min(org[1] - size[1] for (_, org), (size, _) in zip(lines, sizes)) - pad
+            x1 = max(org[0] + size[0] for (_, org), (size, _) in zip(lines, sizes)) + pad
+            y1 = max(org[1] + base for (_, org), (_, base) in zip(lines, sizes)) + pad
+
+        tile = np.zeros((y1 - y0, x1 - x0, 3), dtype=np.uint8)
+        for text, (ox, oy) in lines:
+            cv2.putText(tile, text, (ox - x0, oy - y0), font, font_scale, color, thickness)
+
+        if box:
+            # Black background everywhere inside the box, so the tile is copied as-is
+            return x0, y0, tile, None
+        return x0, y0, tile, tile.any(axis=2, keepdims=True)
 
     def get_last_clicked_coords(self) -> Optional[Tuple[float, float, float]]:
         """Get the last clicked world coordinates."""
@@ -355,6 +656,7 @@ class CustomRenderer:
     def close(self):
         """Clean up renderer resources."""
         print("[CustomRenderer] Closing renderer")
-        cv2.destroyWindow(self.window_name)
-        cv2.destroyAllWindows()
+        # Off the main thread, only signal run() to stop; it destroys the window on its way out
         self.is_active = False
+        if threading.current_thread() is threading.main_thread():
+            self._destroy_window()
@@ -1,6 +1,47 @@
+import math
 import numpy as np
 from typing import List
 
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - optional speedup
+    njit = None
+
+
+def _hivemind_update_loop(rel_x, rel_y, rel_z, tx, ty, tz, c, s, scale, out):
+    """Per-drone loop: out[i] = Rz(yaw) * scale * rel[i] + target, with c/s already scaled."""
+    for i in range(rel_x.shape[0]):
+        out[i, 0] = c * rel_x[i] - s * rel_y[i] + tx
+        out[i, 1] = s * rel_x[i] + c * rel_y[i] + ty
+        out[i, 2] = scale * rel_z[i] + tz
+
+
+def _hivemind_update_numpy(rel_x, rel_y, rel_z, tx, ty, tz, c, s, scale, out):
+    """NumPy fallback with the same contract as the JIT kernel."""
+    x, y, z = out.T
+
+    # x = c*rx - s*ry + tx
+    np.multiply(rel_x, c, out=x)
+    x -= rel_y * s
+    x += tx
+
+    # y = s*rx + c*ry + ty
+    np.multiply(rel_x, s, out=y)
+    y += rel_y * c
+    y += ty
+
+    # z = scale*rz + tz
+    np.multiply(rel_z, scale, out=z)
+    z += tz
+
+
+if njit is not None:
+    _hivemind_update = njit(cache=True, fastmath=True)(_hivemind_update_loop)
+    # Compile now (or load from the on-disk cache) instead of on the first update
+    _hivemind_update(np.zeros(1), np.zeros(1), np.zeros(1), 0.0, 0.0, 0.0, 1.0, 0.0, 1.0, np.empty((1, 3)))
+else:
+    _hivemind_update = _hivemind_update_numpy
+
 class HivemindController:
     """
     Controls the entire swarm as a single entity.
@@ -18,6 +59,11 @@ class HivemindController:
         self.initial_positions = initial_positions
         self.relative_positions = self.initial_positions - np.mean(self.initial_positions, axis=0)
 
+        # Contiguous per-axis columns of the relative layout, reused by every update()
+        self._rel_x = np.ascontiguousarray(self.relative_positions[:, 0], dtype=float)
+        self._rel_y = np.ascontiguousarray(self.relative_positions[:, 1], dtype=float)
+        self._rel_z = np.ascontiguousarray(self.relative_positions[:, 2], dtype=float)
+
         self.target_position = np.mean(self.initial_positions, axis=0)
         self.target_yaw = 0.0
         self.target_scale = 1.0
@@ -42,18 +88,13 @@ class HivemindController:
         Returns:
             An array of target positions for each drone.
         """
-        # Create rotation matrix from yaw
-        rotation_matrix = np.array([
-            [np.cos(self.target_yaw), -np.sin(self.target_yaw), 0],
-            [np.sin(self.target_yaw), np.cos(self.target_yaw), 0],
-            [0, 0, 1]
-        ])
-
-        # Apply rotation and scale to relative positions
-        scaled_rotated_positions = self.relative_positions * self.target_scale
-        transformed_positions = np.dot(scaled_rotated_positions, rotation_matrix.T)
-
-        # Add target position to get absolute target positions
-        drone_target_positions = self.target_position + transformed_positions
+        # Rotation about z and scale folded into two coefficients (no 3x3 matrix)
+        c = math.cos(self.target_yaw) * self.target_scale
+        s = math.sin(self.target_yaw) * self.target_scale
+        tx, ty, tz = (float(v) for v in self.target_position)
+
+        drone_target_positions = np.empty((self.num_drones, 3))
+        _hivemind_update(self._rel_x, self._rel_y, self._rel_z, tx, ty, tz,
+                         c, s, float(self.target_scale), drone_target_positions)
 
         return drone_target_positions
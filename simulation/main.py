@@ -5,12 +5,14 @@ Launches both the simulation loop and FastAPI server in the same process.
 
 import argparse
 import asyncio
+import importlib.util
 import os
 import signal
 import sys
 import threading
 import time
 from contextlib import asynccontextmanager
+from typing import List, Tuple, Union
 
 # Fix for hybrid Intel/NVIDIA systems: Force NVIDIA GPU for PyBullet GUI
 # This resolves "Failed to retrieve a framebuffer config" errors on Ubuntu 24.04
@@ -23,7 +25,7 @@ os.environ['__GL_SYNC_TO_VBLANK'] = '0'
 os.environ['vblank_mode'] = '0'
 
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 import json
@@ -32,8 +34,10 @@ from swarm import SwarmWorld, DroneCommand
 from swarm_rust import SwarmWorldRust
 from api_schemas import (
     SpawnRequest, TakeoffRequest, LandRequest, HoverRequest,
-    GotoRequest, VelocityRequest, FormationRequest,
-    StateResponse, CommandResponse, ResetResponse, ClickCoordsResponse
+    GotoRequest, VelocityRequest, GotoBatchRequest, VelocityBatchRequest, FormationRequest,
+    StateResponse, CommandResponse, FormationResponse, ResetResponse, ClickCoordsResponse,
+    SPAWN_ADAPTER, TAKEOFF_ADAPTER, LAND_ADAPTER, HOVER_ADAPTER, GOTO_ADAPTER, VELOCITY_ADAPTER,
+    FORMATION_ADAPTER
 )
 
 
@@ -76,21 +80,64 @@ class ConnectionManager:
 manager = ConnectionManager()
 
 
+def _command_response(message: str, affected_drones: List[int]) -> ORJSONResponse:
+    """
+    Successful CommandResponse body, encoded directly with orjson.
+
+    Returning a Response skips FastAPI's response_model validate/serialize pass;
+    the response_model on each route is kept for the OpenAPI docs only.
+    """
+    return ORJSONResponse({"success": True, "message": message, "affected_drones": affected_drones})
+
+
+def _check_ids(ids: List[int]):
+    """
+    Range-check explicit drone IDs with one C-level min/max pass, only
+    scanning for the offending ID on the error path.
+    """
+    if ids and (min(ids) < 0 or max(ids) >= swarm.num_drones):
+        bad_id = next(i for i in ids if not 0 <= i < swarm.num_drones)
+        raise HTTPException(status_code=400, detail=f"Invalid drone ID: {bad_id}")
+
+
+def _resolve_ids(ids: list) -> Tuple[Union[List[int], str], List[int]]:
+    """
+    Resolve a validated DroneIds field to (command ids, affected ids).
+
+    ["all"] becomes the "all" sentinel; explicit IDs are range-checked by _check_ids.
+    """
+    if ids == ["all"]:
+        return "all", list(range(swarm.num_drones))
+    _check_ids(ids)
+    return ids, ids
+
+
 def run_api_server():
     """Background thread running the API server."""
     print("[APIServer] Starting FastAPI server")
+    # uvloop and httptools come with uvicorn[standard]; request them by name so the log
+    # shows when an install without them silently falls back to asyncio/h11
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    print(f"[APIServer] Event loop: {loop}, HTTP parser: {http}")
     uvicorn.run(
         app,
         host=args.host,
         port=args.port,
-        log_level="info"
+        log_level="info",
+        loop=loop,
+        http=http,
+        # Pollers hit /state many times a second: skip the per-request access log line
+        # and hold idle connections open so they are reused instead of re-handshaked
+        access_log=False,
+        timeout_keep_alive=30
     )
 
 def simulation_loop():
-    """Main thread running the physics simulation with GUI."""
+    """Physics simulation loop; on the main thread unless the custom renderer needs it."""
     global swarm, running, web_mode
 
-    print("[SimLoop] Starting simulation loop in MAIN THREAD", flush=True)
+    print(f"[SimLoop] Starting simulation loop in {threading.current_thread().name}", flush=True)
 
     # For Rust physics, we need to throttle to real-time
     # Physics runs at 240Hz = 4.167ms per step
@@ -98,13 +145,13 @@ def simulation_loop():
 
     try:
         step_count = 0
-        last_step_time = time.perf_counter()
+        next_tick = time.perf_counter()
 
         while running:
             if swarm is not None:
                 if step_count == 0:
                     print(f"[SimLoop] Beginning first step...", flush=True)
-                    last_step_time = time.perf_counter()
+                    next_tick = time.perf_counter()
 
                 if not swarm.step():
                     print("[SimLoop] Simulation ended", flush=True)
@@ -112,14 +159,16 @@ def simulation_loop():
 
                 step_count += 1
 
-                # Real-time throttling for Rust physics (web mode)
-                if web_mode:
-                    current_time = time.perf_counter()
-                    elapsed = current_time - last_step_time
-                    sleep_time = physics_dt - elapsed
-                    if sleep_time > 0:
-                        time.sleep(sleep_time)
-                    last_step_time = time.perf_counter()
+                # Real-time throttling for Rust physics (web mode) and for the
+                # custom renderer, which renders on the main thread and doesn't pace physics
+                if web_mode or getattr(swarm, "custom_renderer", None) is not None:
+                    # Pace against absolute deadlines so sleep overshoot doesn't accumulate
+                    next_tick += physics_dt
+                    slack = next_tick - time.perf_counter()
+                    time.sleep(max(0.0, slack))
+                    if slack < -0.1:
+                        # Fell far behind (e.g. a long step); resync instead of bursting to catch up
+                        next_tick = time.perf_counter()
 
                 if step_count % 240 == 0:  # Print every second
                     print(f"[SimLoop] Running... {step_count} steps completed", flush=True)
@@ -167,6 +216,7 @@ Control a physics-based multi-drone simulation with real-time commands.
     """,
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc"
 )
@@ -183,6 +233,25 @@ app.add_middleware(
 
 # API Endpoints
 
+# Static part of the status response, built once rather than on every probe
+ROOT_INFO = {
+    "docs": "http://localhost:8000/docs",
+    "endpoints": (
+        "POST /spawn - Respawn swarm with N drones",
+        "POST /takeoff - Take off drones to altitude",
+        "POST /land - Land drones",
+        "POST /hover - Hover drones at current position",
+        "POST /goto - Move single drone to position",
+        "POST /velocity - Set drone velocity",
+        "POST /goto_batch - Move several drones to positions",
+        "POST /velocity_batch - Set velocity of several drones",
+        "POST /formation - Arrange swarm in formation",
+        "GET /state - Get all drone states",
+        "POST /reset - Reset simulation"
+    )
+}
+
+
 @app.get("/", tags=["Status"])
 async def root():
     """
@@ -196,18 +265,7 @@ async def root():
         "version": "1.0.0",
         "status": "running" if swarm is not None else "not initialized",
         "num_drones": swarm.num_drones if swarm is not None else 0,
-        "docs": "http://localhost:8000/docs",
-        "endpoints": [
-            "POST /spawn - Respawn swarm with N drones",
-            "POST /takeoff - Take off drones to altitude",
-            "POST /land - Land drones",
-            "POST /hover - Hover drones at current position",
-            "POST /goto - Move single drone to position",
-            "POST /velocity - Set drone velocity",
-            "POST /formation - Arrange swarm in formation",
-            "GET /state - Get all drone states",
-            "POST /reset - Reset simulation"
-        ]
+        **ROOT_INFO
     }
 
 
@@ -227,11 +285,7 @@ async def spawn(request: SpawnRequest):
     cmd = DroneCommand("spawn", "all", {"num": request.num})
     swarm.enqueue_command(cmd)
 
-    return CommandResponse(
-        success=True,
-        message=f"Respawning with {request.num} drones",
-        affected_drones=[]
-    )
+    return _command_response(f"Respawning with {request.num} drones", [])
 
 
 @app.post("/takeoff", response_model=CommandResponse, tags=["Basic Flight"])
@@ -252,26 +306,12 @@ async def takeoff(request: TakeoffRequest):
     if swarm is None:
         raise HTTPException(status_code=500, detail="Swarm not initialized")
 
-    # Resolve drone IDs
-    if request.ids == ["all"]:
-        drone_ids = "all"
-        affected = list(range(swarm.num_drones))
-    else:
-        drone_ids = request.ids
-        affected = request.ids
-        # Validate IDs
-        for drone_id in drone_ids:
-            if drone_id >= swarm.num_drones:
-                raise HTTPException(status_code=400, detail=f"Invalid drone ID: {drone_id}")
+    drone_ids, affected = _resolve_ids(request.ids)
 
     cmd = DroneCommand("takeoff", drone_ids, {"altitude": request.altitude})
     swarm.enqueue_command(cmd)
 
-    return CommandResponse(
-        success=True,
-        message=f"Takeoff commanded to altitude {request.altitude}m",
-        affected_drones=affected
-    )
+    return _command_response(f"Takeoff commanded to altitude {request.altitude}m", affected)
 
 
 @app.post("/land", response_model=CommandResponse, tags=["Basic Flight"])
@@ -286,26 +326,12 @@ async def land(request: LandRequest):
     if swarm is None:
         raise HTTPException(status_code=500, detail="Swarm not initialized")
 
-    # Resolve drone IDs
-    if request.ids == ["all"]:
-        drone_ids = "all"
-        affected = list(range(swarm.num_drones))
-    else:
-        drone_ids = request.ids
-        affected = request.ids
-        # Validate IDs
-        for drone_id in drone_ids:
-            if drone_id >= swarm.num_drones:
-                raise HTTPException(status_code=400, detail=f"Invalid drone ID: {drone_id}")
+    drone_ids, affected = _resolve_ids(request.ids)
 
     cmd = DroneCommand("land", drone_ids, {})
     swarm.enqueue_command(cmd)
 
-    return CommandResponse(
-        success=True,
-        message="Land commanded",
-        affected_drones=affected
-    )
+    return _command_response("Land commanded", affected)
 
 
 @app.post("/hover", response_model=CommandResponse, tags=["Basic Flight"])
@@ -320,26 +346,12 @@ async def hover(request: HoverRequest):
     if swarm is None:
         raise HTTPException(status_code=500, detail="Swarm not initialized")
 
-    # Resolve drone IDs
-    if request.ids == ["all"]:
-        drone_ids = "all"
-        affected = list(range(swarm.num_drones))
-    else:
-        drone_ids = request.ids
-        affected = request.ids
-        # Validate IDs
-        for drone_id in drone_ids:
-            if drone_id >= swarm.num_drones:
-                raise HTTPException(status_code=400, detail=f"Invalid drone ID: {drone_id}")
+    drone_ids, affected = _resolve_ids(request.ids)
 
     cmd = DroneCommand("hover", drone_ids, {})
     swarm.enqueue_command(cmd)
 
-    return CommandResponse(
-        success=True,
-        message="Hover commanded",
-        affected_drones=affected
-    )
+    return _command_response("Hover commanded", affected)
 
 
 @app.post("/goto", response_model=CommandResponse, tags=["Advanced Control"])
@@ -374,11 +386,7 @@ async def goto(request: GotoRequest):
     })
     swarm.enqueue_command(cmd)
 
-    return CommandResponse(
-        success=True,
-        message=f"Drone {request.id} going to ({request.x}, {request.y}, {request.z})",
-        affected_drones=[request.id]
-    )
+    return _command_response(f"Drone {request.id} going to ({request.x}, {request.y}, {request.z})", [request.id])
 
 
 @app.post("/velocity", response_model=CommandResponse, tags=["Advanced Control"])
@@ -412,15 +420,74 @@ async def velocity(request: VelocityRequest):
     })
     swarm.enqueue_command(cmd)
 
-    return CommandResponse(
-        success=True,
-        message=f"Drone {request.id} velocity set",
-        affected_drones=[request.id]
-    )
+    return _command_response(f"Drone {request.id} velocity set", [request.id])
+
+
+@app.post("/goto_batch", response_model=CommandResponse, tags=["Advanced Control"])
+async def goto_batch(request: GotoBatchRequest):
+    """
+    **Move Several Drones to Positions**
+
+    Batched form of `/goto`: one request carries columnar arrays, one entry per drone.
+
+    - **ids**: Drone IDs
+    - **x, y, z**: Target positions in meters (same bounds as `/goto`)
+    - **yaw**: Headings in radians (optional, defaults to 0.0)
+
+    **Example:** Move drones 0 and 1
+    ```json
+    {"ids": [0, 1], "x": [2.0, -1.5], "y": [1.0, 2.0], "z": [1.5, 2.0]}
+    ```
+    """
+    if swarm is None:
+        raise HTTPException(status_code=500, detail="Swarm not initialized")
+
+    _check_ids(request.ids)
+
+    yaws = request.yaw or [0.0] * len(request.ids)
+    for drone_id, x, y, z, yaw in zip(request.ids, request.x, request.y, request.z, yaws):
+        swarm.enqueue_command(DroneCommand("goto", [drone_id], {
+            "id": drone_id,
+            "x": x,
+            "y": y,
+            "z": z,
+            "yaw": yaw
+        }))
+
+    return _command_response(f"{len(request.ids)} drones going to target positions", request.ids)
+
+
+@app.post("/velocity_batch", response_model=CommandResponse, tags=["Advanced Control"])
+async def velocity_batch(request: VelocityBatchRequest):
+    """
+    **Set Velocity of Several Drones**
+
+    Batched form of `/velocity`: one request carries columnar arrays, one entry per drone.
+
+    - **ids**: Drone IDs
+    - **vx, vy, vz**: Velocity components in m/s (±5.0 bounds)
+    - **yaw_rate**: Yaw rates in rad/s (optional, defaults to 0.0)
+    """
+    if swarm is None:
+        raise HTTPException(status_code=500, detail="Swarm not initialized")
+
+    _check_ids(request.ids)
+
+    yaw_rates = request.yaw_rate or [0.0] * len(request.ids)
+    for drone_id, vx, vy, vz, yaw_rate in zip(request.ids, request.vx, request.vy, request.vz, yaw_rates):
+        swarm.enqueue_command(DroneCommand("velocity", [drone_id], {
+            "id": drone_id,
+            "vx": vx,
+            "vy": vy,
+            "vz": vz,
+            "yaw_rate": yaw_rate
+        }))
+
+    return _command_response(f"{len(request.ids)} drone velocities set", request.ids)
 
 
-@app.post("/formation", response_model=CommandResponse, tags=["Swarm Formations"])
-async def formation(request: FormationRequest):
+@app.post("/formation", response_model=FormationResponse, tags=["Swarm Formations"])
+async def formation(request: FormationRequest, return_state: bool = False):
     """
     **Arrange Swarm in Formation**
 
@@ -432,6 +499,9 @@ async def formation(request: FormationRequest):
     - **radius**: Circle radius (0.5-5.0m, for circle only)
     - **axis**: Line direction ("x" or "y", for line only)
 
+    Pass `?return_state=true` to include the current swarm state in the
+    response, saving a separate `GET /state` round trip.
+
     **Examples:**
 
     Circle formation:
@@ -466,11 +536,12 @@ async def formation(request: FormationRequest):
     })
     swarm.enqueue_command(cmd)
 
-    return CommandResponse(
-        success=True,
-        message=f"Formation '{request.pattern}' commanded",
-        affected_drones=list(range(swarm.num_drones))
-    )
+    return ORJSONResponse({
+        "success": True,
+        "message": f"Formation '{request.pattern}' commanded",
+        "affected_drones": list(range(swarm.num_drones)),
+        "state": swarm.get_state() if return_state else None
+    })
 
 
 @app.get("/state", response_model=StateResponse, tags=["Status"])
@@ -494,8 +565,9 @@ async def state():
     if swarm is None:
         raise HTTPException(status_code=500, detail="Swarm not initialized")
 
-    state_data = swarm.get_state()
-    return StateResponse(**state_data)
+    # Polled at high rate: serve the per-step cached JSON instead of going through the
+    # response model (which is kept above for the OpenAPI docs only)
+    return Response(content=swarm.get_state_json(), media_type="application/json")
 
 
 @app.post("/reset", response_model=ResetResponse, tags=["Swarm Management"])
@@ -514,11 +586,11 @@ async def reset():
     cmd = DroneCommand("reset", "all", {})
     swarm.enqueue_command(cmd)
 
-    return ResetResponse(
-        success=True,
-        message="Simulation reset",
-        num_drones=swarm.num_drones
-    )
+    return ORJSONResponse({
+        "success": True,
+        "message": "Simulation reset",
+        "num_drones": swarm.num_drones
+    })
 
 
 @app.get("/click", response_model=ClickCoordsResponse, tags=["Mouse Interaction"])
@@ -544,18 +616,18 @@ async def get_click_coords():
         raise HTTPException(status_code=500, detail="Swarm not initialized")
 
     if swarm.last_clicked_coords is None:
-        return ClickCoordsResponse(
-            has_click=False,
-            coords=[],
-            message="No click registered yet. Click in the GUI viewport to set coordinates."
-        )
+        return ORJSONResponse({
+            "has_click": False,
+            "coords": [],
+            "message": "No click registered yet. Click in the GUI viewport to set coordinates."
+        })
 
     x, y, z = swarm.last_clicked_coords
-    return ClickCoordsResponse(
-        has_click=True,
-        coords=[x, y, z],
-        message=f"Last click at ({x:.2f}, {y:.2f}, {z:.2f})"
-    )
+    return ORJSONResponse({
+        "has_click": True,
+        "coords": [x, y, z],
+        "message": f"Last click at ({x:.2f}, {y:.2f}, {z:.2f})"
+    })
 
 
 # WebSocket endpoint for real-time communication
@@ -569,48 +641,51 @@ def handle_websocket_command(payload: dict) -> dict:
     params = payload.get("params", {})
 
     try:
+        # Same validation as the HTTP routes, through the adapters cached in api_schemas
         if action == "takeoff":
-            ids = params.get("ids", ["all"])
-            altitude = params.get("altitude", 1.0)
-            drone_ids = "all" if ids == ["all"] else ids
-            cmd = DroneCommand("takeoff", drone_ids, {"altitude": altitude})
+            request = TAKEOFF_ADAPTER.validate_python(params)
+            drone_ids = "all" if request.ids == ["all"] else request.ids
+            cmd = DroneCommand("takeoff", drone_ids, {"altitude": request.altitude})
             swarm.enqueue_command(cmd)
-            return {"success": True, "message": f"Takeoff to {altitude}m"}
+            return {"success": True, "message": f"Takeoff to {request.altitude}m"}
 
         elif action == "land":
-            ids = params.get("ids", ["all"])
-            drone_ids = "all" if ids == ["all"] else ids
+            request = LAND_ADAPTER.validate_python(params)
+            drone_ids = "all" if request.ids == ["all"] else request.ids
             cmd = DroneCommand("land", drone_ids, {})
             swarm.enqueue_command(cmd)
             return {"success": True, "message": "Land commanded"}
 
         elif action == "hover":
-            ids = params.get("ids", ["all"])
-            drone_ids = "all" if ids == ["all"] else ids
+            request = HOVER_ADAPTER.validate_python(params)
+            drone_ids = "all" if request.ids == ["all"] else request.ids
             cmd = DroneCommand("hover", drone_ids, {})
             swarm.enqueue_command(cmd)
             return {"success": True, "message": "Hover commanded"}
 
         elif action == "goto":
-            cmd = DroneCommand("goto", [params["id"]], params)
+            request = GOTO_ADAPTER.validate_python(params)
+            cmd = DroneCommand("goto", [request.id], request.model_dump())
             swarm.enqueue_command(cmd)
-            return {"success": True, "message": f"Drone {params['id']} going to position"}
+            return {"success": True, "message": f"Drone {request.id} going to position"}
 
         elif action == "velocity":
-            cmd = DroneCommand("velocity", [params["id"]], params)
+            request = VELOCITY_ADAPTER.validate_python(params)
+            cmd = DroneCommand("velocity", [request.id], request.model_dump())
             swarm.enqueue_command(cmd)
-            return {"success": True, "message": f"Drone {params['id']} velocity set"}
+            return {"success": True, "message": f"Drone {request.id} velocity set"}
 
         elif action == "formation":
-            cmd = DroneCommand("formation", "all", params)
+            request = FORMATION_ADAPTER.validate_python(params)
+            cmd = DroneCommand("formation", "all", request.model_dump())
             swarm.enqueue_command(cmd)
-            return {"success": True, "message": f"Formation '{params.get('pattern')}' commanded"}
+            return {"success": True, "message": f"Formation '{request.pattern}' commanded"}
 
         elif action == "spawn":
-            num = params.get("num", 5)
-            cmd = DroneCommand("spawn", "all", {"num": num})
+            request = SPAWN_ADAPTER.validate_python(params)
+            cmd = DroneCommand("spawn", "all", {"num": request.num})
             swarm.enqueue_command(cmd)
-            return {"success": True, "message": f"Spawning {num} drones"}
+            return {"success": True, "message": f"Spawning {request.num} drones"}
 
         elif action == "reset":
             cmd = DroneCommand("reset", "all", {})
@@ -660,14 +735,10 @@ async def websocket_endpoint(websocket: WebSocket):
         try:
             while True:
                 if swarm is not None:
-                    state_data = swarm.get_state()
-                    await websocket.send_json({
-                        "type": "state",
-                        "payload": {
-                            "drones": state_data["drones"],
-                            "timestamp": state_data["timestamp"]
-                        }
-                    })
+                    # get_state() is exactly {"drones", "timestamp"}, so the cached
+                    # JSON is spliced in as the payload without re-encoding
+                    payload = swarm.get_state_json().decode()
+                    await websocket.send_text('{"type":"state","payload":' + payload + '}')
                 await asyncio.sleep(1/60)  # 60Hz
         except Exception as e:
             print(f"[WebSocket] Send error: {e}")
@@ -742,6 +813,10 @@ def main():
 
     print("[Main] Starting AUS-Lab Swarm Simulation")
 
+    # On a free-threaded build (3.13t+) the API server and physics threads run in parallel
+    gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"[Main] Python {sys.version.split()[0]}, GIL {'enabled' if gil_enabled else 'disabled (free-threaded)'}")
+
     # Determine which renderer to use
     use_custom = not args.legacy_gui
 
@@ -785,14 +860,24 @@ def main():
     # Give API server time to start
     time.sleep(1)
 
-    # Run simulation loop in main thread (required for PyBullet mouse events)
+    renderer = getattr(swarm, "custom_renderer", None)
     try:
-        simulation_loop()
+        if renderer is not None:
+            # HighGUI must run on the main thread (Cocoa on macOS requires it), so the
+            # custom renderer keeps it and physics steps on a worker thread
+            sim_thread = threading.Thread(target=simulation_loop, name="SimLoop", daemon=True)
+            sim_thread.start()
+            renderer.run(lambda: running and sim_thread.is_alive())
+        else:
+            # Run simulation loop in main thread (required for PyBullet mouse events)
+            simulation_loop()
     except KeyboardInterrupt:
         print("\n[Main] Keyboard interrupt received")
     finally:
         print("[Main] Shutting down...")
         running = False
+        if sim_thread is not None:
+            sim_thread.join(timeout=2.0)
         if swarm is not None:
             swarm.close()
         print("[Main] Cleanup complete")
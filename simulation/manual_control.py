@@ -4,14 +4,30 @@ Manual keyboard control for AUS-Lab simulation.
 Allows you to fly one drone using keyboard while API controls the rest.
 """
 
-import requests
-import time
+import asyncio
+import httpx
 import sys
-import select
 import termios
 import tty
 
+try:
+    from orjson import dumps as json_dumps, loads as json_loads
+except ImportError:  # optional speedup
+    from json import dumps as json_dumps, loads as json_loads
+
+try:
+    import uvloop
+except ImportError:  # Installed with uvicorn[standard] (not on Windows)
+    uvloop = None
+
+try:
+    import websockets
+except ImportError:  # Installed with uvicorn[standard]; fall back to polling /state
+    websockets = None
+
 API_BASE = "http://localhost:8000"
+WS_URL = "ws://localhost:8000/ws"
+JSON_HEADERS = {"Content-Type": "application/json"}
 
 class KeyboardController:
     def __init__(self, drone_id=0):
@@ -21,6 +37,19 @@ class KeyboardController:
         self.step = 0.2  # Movement step in meters
         self.yaw_step = 0.3  # Yaw step in radians (~17 degrees)
 
+        # Persistent keep-alive connection for the 10Hz command stream
+        self._client = httpx.AsyncClient(
+            base_url=API_BASE,
+            timeout=0.5,
+            limits=httpx.Limits(max_keepalive_connections=8)
+        )
+        self._keys = asyncio.Queue()
+
+        # Latest drone list pushed by the /ws state stream (None until the first frame)
+        self._streamed_drones = None
+        self._state_changed = asyncio.Event()
+        self._stream_task = None
+
         # Get terminal settings
         self.old_settings = termios.tcgetattr(sys.stdin)
 
@@ -31,37 +60,93 @@ class KeyboardController:
     def __exit__(self, *args):
         termios.tcsetattr(sys.stdin, termios.TCSADRAIN, self.old_settings)
 
-    def get_key(self, timeout=0.1):
+    async def aclose(self):
+        """Close the HTTP connection pool"""
+        await self._client.aclose()
+
+    def _on_stdin(self):
+        """Event loop callback: stdin is readable"""
+        self._keys.put_nowait(sys.stdin.read(1))
+
+    async def get_key(self, timeout=0.1):
         """Non-blocking key read with timeout"""
-        if select.select([sys.stdin], [], [], timeout)[0]:
-            return sys.stdin.read(1)
-        return None
+        try:
+            return await asyncio.wait_for(self._keys.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
 
-    def send_goto(self):
+    async def wait_for_simulation(self, timeout=10.0):
+        """Poll the API with exponential backoff until the swarm is running"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        delay = 0.05
+        while loop.time() < deadline:
+            try:
+                response = await self._client.get("/", timeout=2.0)
+                if response.is_success and response.json().get("status") == "running":
+                    return True
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(min(delay, max(0.0, deadline - loop.time())))
+            delay = min(delay * 2, 1.0)
+        return False
+
+    async def send_goto(self):
         """Send current position to API"""
         try:
-            response = requests.post(
-                f"{API_BASE}/goto",
-                json={
-                    "id": self.drone_id,
-                    "x": self.position[0],
-                    "y": self.position[1],
-                    "z": self.position[2],
-                    "yaw": self.yaw
-                },
-                timeout=0.5
-            )
-            return response.ok
+            body = json_dumps({
+                "id": self.drone_id,
+                "x": self.position[0],
+                "y": self.position[1],
+                "z": self.position[2],
+                "yaw": self.yaw
+            })
+            response = await self._client.post("/goto", content=body, headers=JSON_HEADERS)
+            return response.is_success
         except Exception as e:
             print(f"\nAPI Error: {e}")
             return False
 
-    def get_state(self):
+    async def _consume_state_stream(self):
+        """Keep the latest state from the /ws stream and signal each new frame"""
+        try:
+            async with websockets.connect(WS_URL) as ws:
+                async for message in ws:
+                    data = json_loads(message)
+                    if data.get("type") == "state":
+                        self._streamed_drones = data["payload"]["drones"]
+                        self._state_changed.set()
+        except (OSError, websockets.WebSocketException):
+            pass
+        finally:
+            # Stream gone: get_state() goes back to polling
+            self._streamed_drones = None
+
+    async def _next_streamed_drones(self, timeout=1.0):
+        """Wait for the next streamed state frame, or None if the stream is not live"""
+        if self._stream_task is None or self._stream_task.done():
+            return None
+        self._state_changed.clear()
+        try:
+            await asyncio.wait_for(self._state_changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        return self._streamed_drones
+
+    async def get_state(self):
         """Get current drone state from simulation"""
+        drones = await self._next_streamed_drones()
+        if drones is not None:
+            if self.drone_id >= len(drones):
+                return None
+            drone_data = drones[self.drone_id]
+            self.position = drone_data['pos']
+            return drone_data
+
         try:
-            response = requests.get(f"{API_BASE}/state", timeout=0.5)
-            if response.ok:
-                data = response.json()
+            response = await self._client.get("/state")
+            if response.is_success:
+                data = json_loads(response.content)
                 drone_data = data['drones'][self.drone_id]
                 self.position = drone_data['pos']
                 return drone_data
@@ -69,7 +154,7 @@ class KeyboardController:
         except:
             return None
 
-    def run(self):
+    async def run(self):
         """Main control loop"""
         print("=" * 60)
         print("  AUS-Lab Manual Drone Control")
@@ -86,21 +171,27 @@ class KeyboardController:
         print("  1-5 - Switch to controlling drone 1-5")
         print("  ESC or Ctrl+C - Exit")
         print("\nStarting in 2 seconds...")
-        time.sleep(2)
+        if websockets is not None:
+            self._stream_task = asyncio.create_task(self._consume_state_stream())
+        await asyncio.sleep(2)
 
         # Initialize position from simulation
-        state = self.get_state()
+        state = await self.get_state()
         if state:
             print(f"\nCurrent position: ({self.position[0]:.2f}, {self.position[1]:.2f}, {self.position[2]:.2f})")
 
         print("\nReady! Use keyboard to fly.\n")
 
-        last_update = time.time()
+        loop = asyncio.get_running_loop()
+        last_update = loop.time()
         update_interval = 0.1  # 10Hz updates
 
+        # Keys arrive through the event loop instead of a blocking select()
+        loop.add_reader(sys.stdin.fileno(), self._on_stdin)
+
         try:
             while True:
-                key = self.get_key(0.05)
+                key = await self.get_key(0.05)
 
                 if key:
                     moved = False
@@ -144,7 +235,7 @@ class KeyboardController:
                     # Special commands
                     elif key == ' ':
                         # Hover - update position from current actual position
-                        state = self.get_state()
+                        state = await self.get_state()
                         if state:
                             print(f"Hover at ({self.position[0]:.2f}, {self.position[1]:.2f}, {self.position[2]:.2f})")
 
@@ -164,7 +255,7 @@ class KeyboardController:
                         new_id = int(key) - 1
                         if new_id < 5:  # Assuming max 5 drones
                             self.drone_id = new_id
-                            state = self.get_state()
+                            state = await self.get_state()
                             print(f"\nNow controlling Drone {self.drone_id}")
                             print(f"Position: ({self.position[0]:.2f}, {self.position[1]:.2f}, {self.position[2]:.2f})")
 
@@ -180,33 +271,39 @@ class KeyboardController:
                         self.position[1] = max(-10, min(10, self.position[1]))
                         self.position[2] = max(0.1, min(5, self.position[2]))
 
-                        self.send_goto()
-                        last_update = time.time()
+                        await self.send_goto()
+                        last_update = loop.time()
 
                 # Periodic position updates even without input (for smooth control)
-                if time.time() - last_update > update_interval:
-                    self.send_goto()
-                    last_update = time.time()
+                if loop.time() - last_update > update_interval:
+                    await self.send_goto()
+                    last_update = loop.time()
 
-        except KeyboardInterrupt:
-            print("\n\nInterrupted by user")
         finally:
+            loop.remove_reader(sys.stdin.fileno())
+            if self._stream_task is not None:
+                self._stream_task.cancel()
             print(f"\nDrone {self.drone_id} released to API control")
 
 
-def main():
-    # Check if simulation is running
+async def main_async(drone_id):
+    controller = KeyboardController(drone_id)
     try:
-        response = requests.get(API_BASE, timeout=2)
-        if not response.ok:
-            print("Error: Simulation API not responding")
-            print(f"Make sure simulation is running: python main.py")
+        # Check if simulation is running
+        if not await controller.wait_for_simulation():
+            print(f"Error: Cannot connect to simulation at {API_BASE}")
+            print("Make sure simulation is running: python main.py")
             return 1
-    except Exception as e:
-        print(f"Error: Cannot connect to simulation at {API_BASE}")
-        print("Make sure simulation is running: python main.py")
-        return 1
 
+        with controller:
+            await controller.run()
+    finally:
+        await controller.aclose()
+
+    return 0
+
+
+def main():
     # Start keyboard controller
     drone_id = 0
     if len(sys.argv) > 1:
@@ -215,10 +312,13 @@ def main():
         except:
             print(f"Invalid drone ID, using default (0)")
 
-    with KeyboardController(drone_id) as controller:
-        controller.run()
-
-    return 0
+    try:
+        if uvloop is not None:
+            return uvloop.run(main_async(drone_id))
+        return asyncio.run(main_async(drone_id))
+    except KeyboardInterrupt:
+        print("\n\nInterrupted by user")
+        return 0
 
 
 if __name__ == "__main__":
@@ -3,20 +3,50 @@ SwarmWorld: Wrapper around gym-pybullet-drones for multi-UAV swarm simulation.
 """
 
 
+import threading
 import time
 import numpy as np
+import orjson
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple, Union
-from queue import Queue, Empty
+from collections import deque
 from enum import Enum
 
 from gym_pybullet_drones.envs.VelocityAviary import VelocityAviary
 from gym_pybullet_drones.utils.enums import DroneModel, Physics
 
-from controllers import PositionController, FormationPlanner, clamp_position, clamp_velocity
+from controllers import SwarmPositionController, FormationPlanner, clamp_position, clamp_velocity
 from mouse_handler import MouseInteractionHandler
 from custom_renderer import CustomRenderer
 
 
+@lru_cache(maxsize=32)
+def _formation_targets(pattern: str, center: Tuple[float, float, float], num_drones: int,
+                       spacing: float, radius: float, axis: str) -> Optional[np.ndarray]:
+    """
+    Clamped (N, 3) target positions for a formation, cached per parameter set.
+
+    Re-issuing the same formation skips the planner math entirely. The
+    returned array is shared between calls and therefore read-only.
+    Returns None for an unknown pattern.
+    """
+    center = np.array(center)
+    if pattern == "line":
+        positions = FormationPlanner.line(center, num_drones, spacing, axis)
+    elif pattern == "circle":
+        positions = FormationPlanner.circle(center, num_drones, radius)
+    elif pattern == "grid":
+        positions = FormationPlanner.grid(center, num_drones, spacing)
+    elif pattern == "v":
+        positions = FormationPlanner.v_formation(center, num_drones, spacing)
+    else:
+        return None
+
+    targets = clamp_position(positions[:num_drones])
+    targets.setflags(write=False)
+    return targets
+
+
 class DroneMode(Enum):
     """Operational modes for individual drones."""
     IDLE = "idle"
@@ -28,8 +58,18 @@ class DroneMode(Enum):
     MONITOR = "monitor"  # Orbital surveillance mode
 
 
+# Modes in which the drone is steered by the position controller
+POSITION_CONTROL_MODES = (DroneMode.TAKEOFF, DroneMode.LANDING, DroneMode.GOTO, DroneMode.HOVER, DroneMode.MONITOR)
+
+# Largest pose change (meters, or quaternion component) the custom renderer may leave undrawn
+RENDER_POSE_EPSILON = 1e-3
+
+
 class DroneCommand:
     """Command to be executed by a drone."""
+    # One is allocated per API call; slots skip the per-instance __dict__
+    __slots__ = ("cmd_type", "drone_ids", "params")
+
     def __init__(self, cmd_type: str, drone_ids: Union[List[int], str], params: Dict):
         self.cmd_type = cmd_type
         self.drone_ids = drone_ids
@@ -66,8 +106,17 @@ class SwarmWorld:
         self.physics_dt = 1.0 / physics_hz
         self.control_dt = 1.0 / control_hz
 
-        # Command queue for thread-safe operation
-        self.command_queue: Queue = Queue()
+        # Command queue for thread-safe operation: API thread appends, sim thread pops.
+        # deque append/popleft are atomic, so this single-producer/single-consumer
+        # handoff needs no lock or condition variable (unlike queue.Queue)
+        self.command_queue: deque = deque()
+
+        # Rendering (set up by _init_environment)
+        self.custom_renderer: Optional[CustomRenderer] = None
+        self.mouse_handler: Optional[MouseInteractionHandler] = None
+        self.last_clicked_coords: Optional[Tuple[float, float, float]] = None
+        # Serializes pybullet access between the physics thread and the main-thread renderer
+        self.physics_lock = threading.Lock()
 
         # Initialize environment
         self._init_environment()
@@ -81,16 +130,14 @@ class SwarmWorld:
         self.hover_positions: Dict[int, np.ndarray] = {}
 
         # Controllers
-        self.position_controllers: Dict[int, PositionController] = {
-            i: PositionController() for i in range(num_drones)
-        }
+        self.position_controller = SwarmPositionController(num_drones)
 
-        # Battery simulation
-        self.batteries: Dict[int, float] = {i: 100.0 for i in range(num_drones)}
+        # Battery simulation (percent per drone, indexed by drone ID)
+        self.batteries: np.ndarray = np.full(num_drones, 100.0)
         self.battery_drain_rate = 0.5  # percent per minute at hover
 
-        # Health status
-        self.health_status: Dict[int, bool] = {i: True for i in range(num_drones)}
+        # Health status (indexed by drone ID)
+        self.health_status: np.ndarray = np.ones(num_drones, dtype=bool)
 
         # Speed multiplier (1.0 = normal speed)
         self.speed_multiplier: float = 1.0
@@ -107,10 +154,13 @@ class SwarmWorld:
         self.last_control_time = 0.0
         self.step_count = 0
 
-        # Rendering
-        self.custom_renderer: Optional[CustomRenderer] = None
-        self.mouse_handler: Optional[MouseInteractionHandler] = None
-        self.last_clicked_coords: Optional[Tuple[float, float, float]] = None
+        # Serialized state cache for get_state_json(); the version bumps whenever
+        # physics advances or the world is reset, which invalidates the cache
+        self._state_version = 0
+        self._state_json: Optional[Tuple[int, bytes]] = None
+
+        # Drone poses (N, 7) as of the last scene_version handed to the custom renderer
+        self._rendered_poses: Optional[np.ndarray] = None
 
         print(f"[SwarmWorld] Initialized with {num_drones} drones")
         print(f"[SwarmWorld] Physics: {physics_hz}Hz, Control: {control_hz}Hz")
@@ -154,7 +204,11 @@ class SwarmWorld:
         # Initialize renderer
         physics_client_id = self.env.getPyBulletClient()
 
-        if self.use_custom_renderer:
+        if self.use_custom_renderer and self.custom_renderer is not None:
+            # Respawn: keep the window (it belongs to the main thread) and render the new client
+            self.custom_renderer.set_physics_client(physics_client_id)
+
+        elif self.use_custom_renderer:
             # Initialize custom OpenCV renderer
             print("[SwarmWorld] Initializing custom renderer...")
             self.custom_renderer = CustomRenderer(
@@ -165,7 +219,8 @@ class SwarmWorld:
                 camera_yaw=50,
                 camera_pitch=-35,
                 camera_target=(0, 0, 0),
-                render_fps=60
+                render_fps=60,
+                physics_lock=self.physics_lock
             )
             print("[SwarmWorld] Custom renderer ready - Right-click in window to capture coordinates!")
 
@@ -183,7 +238,7 @@ class SwarmWorld:
 
     def enqueue_command(self, command: DroneCommand):
         """Thread-safe command queuing."""
-        self.command_queue.put(command)
+        self.command_queue.append(command)
 
     def step(self) -> bool:
         """
@@ -194,16 +249,10 @@ class SwarmWorld:
         """
         # Handle rendering and mouse input
         if self.custom_renderer is not None:
-            # Custom renderer handles both rendering and mouse input
-            try:
-                if not self.custom_renderer.render():
-                    print("[SwarmWorld] Renderer returned False - closing")
-                    return False  # Window closed
-            except Exception as e:
-                print(f"[SwarmWorld] ERROR in custom renderer: {e}")
-                import traceback
-                traceback.print_exc()
-                return False
+            # Custom renderer draws and handles mouse input on the main thread (see CustomRenderer.run)
+            if not self.custom_renderer.is_active:
+                print("[SwarmWorld] Renderer stopped - closing")
+                return False  # Window closed
 
             # Get clicked coordinates from custom renderer
             clicked_coords = self.custom_renderer.get_last_clicked_coords()
@@ -235,7 +284,9 @@ class SwarmWorld:
             # Step physics simulation
             # Gymnasium API returns 5 values: obs, rewards, terminated, truncated, infos
             # Older gym-pybullet-drones might use old Gym API (4 values)
-            step_result = self.env.step(self._compute_actions())
+            actions = self._compute_actions()
+            with self.physics_lock:
+                step_result = self.env.step(actions)
             if len(step_result) == 5:
                 obs, rewards, terminated, truncated, infos = step_result
                 dones = {i: terminated.get(i, False) or truncated.get(i, False)
@@ -247,6 +298,11 @@ class SwarmWorld:
             # Update simulation time
             self.sim_time += self.physics_dt
             self.step_count += 1
+            self._state_version += 1
+
+        # Let the renderer skip frames while no drone visibly moves
+        if self.custom_renderer is not None:
+            self._publish_scene_version()
 
         # Update battery levels
         if self.step_count % self.physics_hz == 0:  # Once per second
@@ -257,14 +313,21 @@ class SwarmWorld:
 
         return not all(dones.values())
 
+    def _publish_scene_version(self):
+        """Bump the renderer's scene_version once any drone pose has moved past RENDER_POSE_EPSILON."""
+        poses = np.hstack((self._get_positions(), self.env.quat[:self.num_drones]))
+        last = self._rendered_poses
+        if last is not None and last.shape == poses.shape and np.abs(poses - last).max() < RENDER_POSE_EPSILON:
+            return
+        self._rendered_poses = poses
+        self.custom_renderer.scene_version = (self.custom_renderer.scene_version or 0) + 1
+
     def _process_commands(self):
         """Process all queued commands."""
-        while True:
-            try:
-                cmd = self.command_queue.get_nowait()
-                self._execute_command(cmd)
-            except Empty:
-                break
+        # Only this thread removes items, so a non-empty check can't race with popleft
+        queue = self.command_queue
+        while queue:
+            self._execute_command(queue.popleft())
 
     def _execute_command(self, cmd: DroneCommand):
         """Execute a single command."""
@@ -331,8 +394,7 @@ class SwarmWorld:
         base_velocity = 2.0  # Base max velocity in m/s
         new_max_velocity = base_velocity * speed_multiplier
 
-        for drone_id in range(self.num_drones):
-            self.position_controllers[drone_id].set_max_velocity(new_max_velocity)
+        self.position_controller.set_max_velocity(new_max_velocity)
 
         print(f"[SwarmWorld] Speed set to {speed_multiplier:.1f}x (max velocity: {new_max_velocity:.1f} m/s)")
 
@@ -346,13 +408,9 @@ class SwarmWorld:
 
         # If only one drone, go directly to waypoint
         if self.num_drones == 1:
-            positions = [center]
+            positions = center[np.newaxis]
 
-        for i, pos in enumerate(positions):
-            if i < self.num_drones:
-                self.target_positions[i] = clamp_position(pos)
-                self.target_yaws[i] = 0.0
-                self.drone_modes[i] = DroneMode.GOTO
+        self.set_all_targets(positions)
 
         print(f"[SwarmWorld] Waypoint set: ({x:.2f}, {y:.2f}, {z:.2f}) - {self.num_drones} drones moving")
 
@@ -430,33 +488,43 @@ class SwarmWorld:
         self.drone_modes[drone_id] = DroneMode.VELOCITY
         print(f"[SwarmWorld] Drone {drone_id} velocity set to {clamped_vel}")
 
+    def set_all_targets(self, positions: np.ndarray, yaw: float = 0.0):
+        """
+        Send every drone to its row of an (N, 3) target array in GOTO mode.
+
+        Takes HivemindController.update() output (or any formation) as-is; the
+        whole array is clamped to the arena in one pass. Not thread-safe: call it
+        from the simulation thread, like the queued commands that use it.
+
+        Args:
+            positions: (num_drones, 3) target positions, row i for drone i
+            yaw: Target yaw for every drone (radians)
+        """
+        positions = clamp_position(np.asarray(positions, dtype=float))
+        if positions.shape != (self.num_drones, 3):
+            raise ValueError(f"Expected ({self.num_drones}, 3) target positions, got {positions.shape}")
+
+        for i, pos in enumerate(positions):
+            self.target_positions[i] = pos
+            self.target_yaws[i] = yaw
+            self.drone_modes[i] = DroneMode.GOTO
+
     def _set_formation(self, params: Dict):
         """Set swarm formation."""
         pattern = params["pattern"]
-        center = np.array(params["center"])
-        spacing = params.get("spacing", 1.0)
-        radius = params.get("radius", 1.5)
-        axis = params.get("axis", "x")
-
-        # Generate formation positions
-        if pattern == "line":
-            positions = FormationPlanner.line(center, self.num_drones, spacing, axis)
-        elif pattern == "circle":
-            positions = FormationPlanner.circle(center, self.num_drones, radius)
-        elif pattern == "grid":
-            positions = FormationPlanner.grid(center, self.num_drones, spacing)
-        elif pattern == "v":
-            positions = FormationPlanner.v_formation(center, self.num_drones, spacing)
-        else:
+        targets = _formation_targets(
+            pattern,
+            tuple(float(c) for c in params["center"]),
+            self.num_drones,
+            params.get("spacing", 1.0),
+            params.get("radius", 1.5),
+            params.get("axis", "x")
+        )
+        if targets is None:
             print(f"[SwarmWorld] Unknown formation pattern: {pattern}")
             return
 
-        # Assign target positions to each drone
-        for i, pos in enumerate(positions):
-            if i < self.num_drones:
-                self.target_positions[i] = clamp_position(pos)
-                self.target_yaws[i] = 0.0
-                self.drone_modes[i] = DroneMode.GOTO
+        self.set_all_targets(targets)
 
         print(f"[SwarmWorld] Formation '{pattern}' commanded for {self.num_drones} drones")
 
@@ -519,56 +587,41 @@ class SwarmWorld:
         Returns:
             Action array for gym-pybullet-drones environment
         """
-        actions = np.zeros((self.num_drones, 4))
+        vel_cmds = np.zeros((self.num_drones, 3))
 
-        for drone_id in range(self.num_drones):
-            mode = self.drone_modes[drone_id]
+        # Position-controlled drones are run through the swarm PID in one batch
+        ids = np.fromiter(
+            (i for i in range(self.num_drones)
+             if self.drone_modes[i] in POSITION_CONTROL_MODES and i in self.target_positions),
+            dtype=np.intp
+        )
+        if len(ids):
+            target_pos = np.array([self.target_positions[i] for i in ids])
+            target_yaw = np.fromiter((self.target_yaws.get(i, 0.0) for i in ids), dtype=float, count=len(ids))
+            pid_vel, pid_yaw_rate = self.position_controller.compute_control(
+                ids, self._get_positions()[ids], target_pos, self._get_yaws()[ids], target_yaw, self.control_dt
+            )
+            vel_cmds[ids] = pid_vel
 
-            if mode in [DroneMode.TAKEOFF, DroneMode.LANDING, DroneMode.GOTO, DroneMode.HOVER, DroneMode.MONITOR]:
-                # Use position controller
-                if drone_id in self.target_positions:
-                    current_pos = self._get_position(drone_id)
-                    current_yaw = self._get_yaw(drone_id)
-                    target_pos = self.target_positions[drone_id]
-                    target_yaw = self.target_yaws.get(drone_id, 0.0)
+            # Store computed velocity
+            for drone_id, vel_cmd, yaw_rate_cmd in zip(ids.tolist(), pid_vel, pid_yaw_rate.tolist()):
+                self.target_velocities[drone_id] = vel_cmd
+                self.target_yaw_rates[drone_id] = yaw_rate_cmd
 
-                    vel_cmd, yaw_rate_cmd = self.position_controllers[drone_id].compute_control(
-                        current_pos, target_pos, current_yaw, target_yaw, self.control_dt
-                    )
-
-                    # Store computed velocity
-                    self.target_velocities[drone_id] = vel_cmd
-                    self.target_yaw_rates[drone_id] = yaw_rate_cmd
-
-                    # Convert to VelocityAviary format: [vx_dir, vy_dir, vz_dir, speed_fraction]
-                    # VelocityAviary expects direction vector + speed magnitude
-                    speed = np.linalg.norm(vel_cmd)
-                    if speed > 0.01:
-                        # Direction (will be normalized by VelocityAviary)
-                        direction = vel_cmd / speed
-                        # Speed as fraction of max (SPEED_LIMIT in VelocityAviary ~0.25 m/s)
-                        # Our max velocity is 2.0 m/s, normalize to [0, 1]
-                        speed_frac = min(speed / 2.0, 1.0)
-                        actions[drone_id] = [direction[0], direction[1], direction[2], speed_frac]
-                    else:
-                        # Hovering or very small movement
-                        actions[drone_id] = [0, 0, 0, 0]
-                else:
-                    actions[drone_id] = [0, 0, 0, 0]
+        # Direct velocity commands; IDLE drones keep a zero command
+        for drone_id in range(self.num_drones):
+            if self.drone_modes[drone_id] == DroneMode.VELOCITY and drone_id in self.target_velocities:
+                vel_cmds[drone_id] = self.target_velocities[drone_id]
 
-            elif mode == DroneMode.VELOCITY:
-                # Direct velocity command - convert to VelocityAviary format
-                vel = self.target_velocities.get(drone_id, np.zeros(3))
-                speed = np.linalg.norm(vel)
-                if speed > 0.01:
-                    direction = vel / speed
-                    speed_frac = min(speed / 2.0, 1.0)
-                    actions[drone_id] = [direction[0], direction[1], direction[2], speed_frac]
-                else:
-                    actions[drone_id] = [0, 0, 0, 0]
-
-            else:  # IDLE
-                actions[drone_id] = [0, 0, 0, 0]
+        # Convert to VelocityAviary format: [vx_dir, vy_dir, vz_dir, speed_fraction]
+        # VelocityAviary expects direction vector + speed magnitude
+        actions = np.zeros((self.num_drones, 4))
+        speed = np.linalg.norm(vel_cmds, axis=1)
+        moving = speed > 0.01  # below this the drone is hovering
+        # Direction (will be normalized by VelocityAviary)
+        actions[moving, :3] = vel_cmds[moving] / speed[moving, None]
+        # Our max velocity is 2.0 m/s, normalize to [0, 1]
+        actions[moving, 3] = np.minimum(speed[moving] / 2.0, 1.0)
 
         return actions
 
@@ -577,11 +630,25 @@ class SwarmWorld:
         state = self.env._getDroneStateVector(drone_id)
         return state[0:3]
 
+    def _get_positions(self) -> np.ndarray:
+        """Get current positions of all drones as an (N, 3) array."""
+        return self.env.pos[:self.num_drones]
+
+    def _get_yaws(self) -> np.ndarray:
+        """Get current yaw of all drones as an (N,) array."""
+        quat = self.env.quat[:self.num_drones]
+        return np.arctan2(2.0 * (quat[:, 3] * quat[:, 2] + quat[:, 0] * quat[:, 1]),
+                          1.0 - 2.0 * (quat[:, 1]**2 + quat[:, 2]**2))
+
     def _get_velocity(self, drone_id: int) -> np.ndarray:
         """Get current velocity of drone."""
         state = self.env._getDroneStateVector(drone_id)
         return state[10:13]
 
+    def _get_velocities(self) -> np.ndarray:
+        """Get current velocities of all drones as an (N, 3) array."""
+        return self.env.vel[:self.num_drones]
+
     def _get_yaw(self, drone_id: int) -> float:
         """Get current yaw of drone."""
         state = self.env._getDroneStateVector(drone_id)
@@ -595,21 +662,20 @@ class SwarmWorld:
     def _update_batteries(self):
         """Update battery levels based on usage."""
         drain_per_second = self.battery_drain_rate / 60.0
-        for drone_id in range(self.num_drones):
-            if self.drone_modes[drone_id] != DroneMode.IDLE:
-                self.batteries[drone_id] = max(0.0, self.batteries[drone_id] - drain_per_second)
+        active = np.fromiter(
+            (self.drone_modes[i] != DroneMode.IDLE for i in range(self.num_drones)),
+            dtype=bool, count=self.num_drones
+        )
+        self.batteries[active] = np.maximum(0.0, self.batteries[active] - drain_per_second)
 
     def _check_health(self):
         """Check and update health status of drones."""
-        for drone_id in range(self.num_drones):
-            pos = self._get_position(drone_id)
-            # Check if out of bounds or battery dead
-            if (abs(pos[0]) > 15.0 or abs(pos[1]) > 15.0 or
-                pos[2] < 0 or pos[2] > 10.0 or
-                self.batteries[drone_id] <= 0.0):
-                self.health_status[drone_id] = False
-            else:
-                self.health_status[drone_id] = True
+        pos = self._get_positions()
+        # Out of bounds or battery dead
+        unhealthy = ((np.abs(pos[:, 0]) > 15.0) | (np.abs(pos[:, 1]) > 15.0) |
+                     (pos[:, 2] < 0) | (pos[:, 2] > 10.0) |
+                     (self.batteries <= 0.0))
+        np.logical_not(unhealthy, out=self.health_status)
 
     def get_state(self) -> Dict:
         """
@@ -618,40 +684,60 @@ class SwarmWorld:
         Returns:
             Dictionary with state information
         """
-        states = []
-        for drone_id in range(self.num_drones):
-            pos = self._get_position(drone_id)
-            vel = self._get_velocity(drone_id)
-            yaw = self._get_yaw(drone_id)
-
-            states.append({
+        # Convert each whole-swarm array to Python values once, then zip into rows
+        states = [
+            {
                 "id": drone_id,
-                "pos": pos.tolist(),
-                "vel": vel.tolist(),
-                "yaw": float(yaw),
-                "battery": float(self.batteries[drone_id]),
-                "healthy": bool(self.health_status[drone_id])
-            })
+                "pos": pos,
+                "vel": vel,
+                "yaw": yaw,
+                "battery": battery,
+                "healthy": healthy
+            }
+            for drone_id, pos, vel, yaw, battery, healthy in zip(
+                range(self.num_drones),
+                self._get_positions().tolist(),
+                self._get_velocities().tolist(),
+                self._get_yaws().tolist(),
+                self.batteries.tolist(),
+                self.health_status.tolist()
+            )
+        ]
 
         return {
             "drones": states,
             "timestamp": float(self.sim_time)
         }
 
+    def get_state_json(self) -> bytes:
+        """
+        get_state() serialized to JSON bytes, cached until the state next changes.
+
+        Every poller within one physics step shares a single serialization.
+        """
+        version = self._state_version
+        cached = self._state_json
+        if cached is None or cached[0] != version:
+            cached = (version, orjson.dumps(self.get_state()))
+            self._state_json = cached
+        return cached[1]
+
     def _reset_simulation(self):
         """Reset simulation to initial state."""
         print("[SwarmWorld] Resetting simulation")
-        self.env.reset()
+        with self.physics_lock:
+            self.env.reset()
         self.sim_time = 0.0
         self.last_control_time = 0.0
         self.step_count = 0
+        self._state_version += 1
 
         # Reset all drone states
+        self.batteries.fill(100.0)
+        self.health_status.fill(True)
         for i in range(self.num_drones):
             self.drone_modes[i] = DroneMode.IDLE
-            self.batteries[i] = 100.0
-            self.health_status[i] = True
-            self.position_controllers[i].reset()
+        self.position_controller.reset()
 
         self.target_positions.clear()
         self.target_yaws.clear()
@@ -662,15 +748,17 @@ class SwarmWorld:
     def _respawn(self, num_drones: int):
         """Respawn simulation with different number of drones."""
         print(f"[SwarmWorld] Respawning with {num_drones} drones")
-        self.env.close()
-        self.num_drones = num_drones
-        self._init_environment()
+        # Hold the physics lock so the renderer never captures from a closed client
+        with self.physics_lock:
+            self.env.close()
+            self.num_drones = num_drones
+            self._init_environment()
 
         # Reinitialize all state
         self.drone_modes = {i: DroneMode.IDLE for i in range(num_drones)}
-        self.batteries = {i: 100.0 for i in range(num_drones)}
-        self.health_status = {i: True for i in range(num_drones)}
-        self.position_controllers = {i: PositionController() for i in range(num_drones)}
+        self.batteries = np.full(num_drones, 100.0)
+        self.health_status = np.ones(num_drones, dtype=bool)
+        self.position_controller = SwarmPositionController(num_drones)
 
         # Apply current speed multiplier to new controllers
         if self.speed_multiplier != 1.0:
@@ -685,6 +773,7 @@ class SwarmWorld:
         self.sim_time = 0.0
         self.last_control_time = 0.0
         self.step_count = 0
+        self._state_version += 1
 
     def close(self):
         """Clean up and close simulation."""
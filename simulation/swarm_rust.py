@@ -4,15 +4,19 @@ Drop-in replacement for the PyBullet-based SwarmWorld.
 """
 
 import time
-from typing import Dict, List, Optional, Union
-from queue import Queue, Empty
+from typing import Dict, List, Optional, Tuple, Union
+from collections import deque
 from enum import Enum
 
 import drone_physics
+import orjson
 
 
 class DroneCommand:
     """Command to be executed by a drone."""
+    # One is allocated per API call; slots skip the per-instance __dict__
+    __slots__ = ("cmd_type", "drone_ids", "params")
+
     def __init__(self, cmd_type: str, drone_ids: Union[List[int], str], params: Dict):
         self.cmd_type = cmd_type
         self.drone_ids = drone_ids
@@ -47,8 +51,10 @@ class SwarmWorldRust:
         self.physics_dt = 1.0 / physics_hz
         self.control_dt = 1.0 / control_hz
 
-        # Command queue for thread-safe operation
-        self.command_queue: Queue = Queue()
+        # Command queue for thread-safe operation: API thread appends, sim thread pops.
+        # deque append/popleft are atomic, so this single-producer/single-consumer
+        # handoff needs no lock or condition variable (unlike queue.Queue)
+        self.command_queue: deque = deque()
 
         # Initialize Rust physics engine
         self.swarm = drone_physics.RustSwarm(num_drones, physics_hz)
@@ -60,12 +66,17 @@ class SwarmWorldRust:
         self.step_count = 0
         self.last_battery_update = 0.0
 
+        # Serialized state cache for get_state_json(); the version bumps whenever
+        # physics advances or the swarm is reset, which invalidates the cache
+        self._state_version = 0
+        self._state_json: Optional[Tuple[int, bytes]] = None
+
         print(f"[SwarmWorldRust] Initialized with {num_drones} drones (Rust physics)")
         print(f"[SwarmWorldRust] Physics: {physics_hz}Hz, Control: {control_hz}Hz")
 
     def enqueue_command(self, command: DroneCommand):
         """Thread-safe command queuing."""
-        self.command_queue.put(command)
+        self.command_queue.append(command)
 
     def step(self) -> bool:
         """
@@ -80,6 +91,7 @@ class SwarmWorldRust:
         # Step physics (Rust handles all the heavy lifting)
         self.swarm.step()
         self.step_count += 1
+        self._state_version += 1
 
         # Update battery levels periodically
         sim_time = self.swarm.get_time()
@@ -91,12 +103,10 @@ class SwarmWorldRust:
 
     def _process_commands(self):
         """Process all queued commands."""
-        while True:
-            try:
-                cmd = self.command_queue.get_nowait()
-                self._execute_command(cmd)
-            except Empty:
-                break
+        # Only this thread removes items, so a non-empty check can't race with popleft
+        queue = self.command_queue
+        while queue:
+            self._execute_command(queue.popleft())
 
     def _execute_command(self, cmd: DroneCommand):
         """Execute a single command."""
@@ -159,6 +169,7 @@ class SwarmWorldRust:
             self.swarm.reset()
             self.step_count = 0
             self.last_battery_update = 0.0
+            self._state_version += 1
             print(f"[SwarmWorldRust] Reset")
 
         elif cmd.cmd_type == "spawn":
@@ -167,6 +178,7 @@ class SwarmWorldRust:
             self.num_drones = num
             self.step_count = 0
             self.last_battery_update = 0.0
+            self._state_version += 1
             print(f"[SwarmWorldRust] Respawned with {num} drones")
 
         elif cmd.cmd_type == "speed":
@@ -213,6 +225,19 @@ class SwarmWorldRust:
             "timestamp": float(self.swarm.get_time())
         }
 
+    def get_state_json(self) -> bytes:
+        """
+        get_state() serialized to JSON bytes, cached until the state next changes.
+
+        Every poller within one physics step shares a single serialization.
+        """
+        version = self._state_version
+        cached = self._state_json
+        if cached is None or cached[0] != version:
+            cached = (version, orjson.dumps(self.get_state()))
+            self._state_json = cached
+        return cached[1]
+
     def close(self):
         """Clean up (nothing to do for Rust physics)."""
         print("[SwarmWorldRust] Closed")